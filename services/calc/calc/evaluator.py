@@ -0,0 +1,150 @@
+"""Whitelisted arithmetic evaluator built on the Python AST"""
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable
+
+Evaluator = Callable[[], Any]
+
+BINARY_OPERATORS: dict[type[ast.operator], Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS: dict[type[ast.unaryop], Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Parsed fine by Python but rejected with a friendly message
+UNSUPPORTED_OPERATORS: dict[type, str] = {
+    ast.BitXor: '^',
+    ast.BitAnd: '&',
+    ast.BitOr: '|',
+    ast.Invert: '~',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+}
+
+# Single-pass scan used only when parsing fails, e.g. "2 ~ 3" is a syntax error
+UNSUPPORTED_OPERATOR_PATTERN = re.compile(r'[\^&|~]|<<|>>')
+
+FUNCTIONS: dict[str, Callable[..., Any]] = {
+    'abs': abs,
+    'round': round,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'pow': pow,
+    'sqrt': math.sqrt,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+}
+
+CONSTANTS: dict[str, float] = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+
+class UnsupportedOperatorError(ValueError):
+    def __init__(self, symbol: str) -> None:
+        super().__init__(f"Operator '{symbol}' is not supported")
+        self.symbol = symbol
+
+
+def _check_operator(op: ast.AST) -> None:
+    symbol = UNSUPPORTED_OPERATORS.get(type(op))
+    if symbol:
+        raise UnsupportedOperatorError(symbol)
+
+
+def _compile_constant(node: ast.Constant) -> Evaluator:
+    value = node.value
+    if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+        raise ValueError(f"Unsupported literal: {value!r}")
+    return lambda: value
+
+
+def _compile_name(node: ast.Name) -> Evaluator:
+    if node.id not in CONSTANTS:
+        raise ValueError(f"Unknown name '{node.id}'")
+    value = CONSTANTS[node.id]
+    return lambda: value
+
+
+def _compile_binop(node: ast.BinOp) -> Evaluator:
+    _check_operator(node.op)
+    op = BINARY_OPERATORS.get(type(node.op))
+    if op is None:
+        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+    left = _compile(node.left)
+    right = _compile(node.right)
+    return lambda: op(left(), right())
+
+
+def _compile_unaryop(node: ast.UnaryOp) -> Evaluator:
+    _check_operator(node.op)
+    op = UNARY_OPERATORS.get(type(node.op))
+    if op is None:
+        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+    operand = _compile(node.operand)
+    return lambda: op(operand())
+
+
+def _compile_call(node: ast.Call) -> Evaluator:
+    if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+        raise ValueError(f"Unknown function: {ast.unparse(node.func)}")
+    if node.keywords:
+        raise ValueError("Keyword arguments are not supported")
+    func = FUNCTIONS[node.func.id]
+    args = [_compile(arg) for arg in node.args]
+    return lambda: func(*[arg() for arg in args])
+
+
+def _compile_sequence(node: ast.List | ast.Tuple) -> Evaluator:
+    items = [_compile(item) for item in node.elts]
+    return lambda: [item() for item in items]
+
+
+_COMPILERS: dict[type[ast.AST], Callable[[Any], Evaluator]] = {
+    ast.Constant: _compile_constant,
+    ast.Name: _compile_name,
+    ast.BinOp: _compile_binop,
+    ast.UnaryOp: _compile_unaryop,
+    ast.Call: _compile_call,
+    ast.List: _compile_sequence,
+    ast.Tuple: _compile_sequence,
+}
+
+
+def _compile(node: ast.AST) -> Evaluator:
+    compiler = _COMPILERS.get(type(node))
+    if compiler is None:
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+    return compiler(node)
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> Evaluator:
+    """Parse an expression once into a tree of closures that can be re-run cheaply"""
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        match = UNSUPPORTED_OPERATOR_PATTERN.search(expression)
+        if match:
+            raise UnsupportedOperatorError(match.group())
+        raise
+    return _compile(tree.body)
+
+
+def evaluate(expression: str) -> Any:
+    return compile_expression(expression)()
@@ -0,0 +1,28 @@
+import pytest
+
+from calc.app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_calculate(client):
+    response = client.post("/calculate", json={"expression": "2 + 3 * 4"})
+    assert response.status_code == 200
+    assert response.get_json() == {"expression": "2 + 3 * 4", "result": "14"}
+
+
+@pytest.mark.parametrize("body", [b"[]", b"[1]", b"1", b'"2 + 2"', b"null", b"{}", b""])
+def test_calculate_rejects_non_object_body(client, body):
+    response = client.post("/calculate", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No data provided"}
+
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_calculate_other_methods_not_allowed(client, method):
+    response = client.open("/calculate", method=method)
+    assert response.status_code == 405
+    assert "POST" in response.headers["Allow"]
@@ -0,0 +1,103 @@
+import math
+
+import pytest
+
+from calc.evaluator import (
+    UNSUPPORTED_OPERATORS,
+    UnsupportedOperatorError,
+    compile_expression,
+    evaluate,
+)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("1 + 2", 3),
+    ("7 - 10", -3),
+    ("6 * 7", 42),
+    ("7 / 2", 3.5),
+    ("7 // 2", 3),
+    ("7 % 3", 1),
+    ("2 ** 10", 1024),
+    ("+5", 5),
+    ("-5", -5),
+    ("1.5 * 2", 3.0),
+])
+def test_allowed_operators(expression, expected):
+    assert evaluate(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2 + 3 * 4", 14),
+    ("(2 + 3) * 4", 20),
+    ("10 - 4 - 3", 3),
+    ("2 ** 3 ** 2", 512),
+    ("-2 ** 2", -4),
+    ("(-2) ** 2", 4),
+    ("8 / 2 * 4", 16.0),
+    ("1 + 7 % 4", 4),
+])
+def test_precedence(expression, expected):
+    assert evaluate(expression) == expected
+
+
+def test_functions_and_constants():
+    assert evaluate("sqrt(16) + max(1, 2, 3)") == 7.0
+    assert evaluate("sum([1, 2, 3])") == 6
+    assert evaluate("2 * pi") == 2 * math.pi
+    assert evaluate("  e  ") == math.e
+
+
+@pytest.mark.parametrize("symbol", UNSUPPORTED_OPERATORS.values())
+def test_unsupported_operators_rejected(symbol):
+    expression = f"{symbol}3" if symbol == '~' else f"6 {symbol} 3"
+    with pytest.raises(UnsupportedOperatorError) as excinfo:
+        evaluate(expression)
+    assert excinfo.value.symbol == symbol
+    assert str(excinfo.value) == f"Operator '{symbol}' is not supported"
+
+
+@pytest.mark.parametrize("expression, symbol", [
+    ("2 ~ 3", '~'),
+    ("2 ^^ 3", '^'),
+    ("1 <<< 2", '<<'),
+    ("4 || 5", '|'),
+])
+def test_unsupported_operator_in_unparseable_expression(expression, symbol):
+    # Only reachable when ast.parse fails; the pattern names the operator instead of a bare SyntaxError
+    with pytest.raises(SyntaxError):
+        compile(expression, "<expression>", "eval")
+    with pytest.raises(UnsupportedOperatorError) as excinfo:
+        evaluate(expression)
+    assert excinfo.value.symbol == symbol
+
+
+def test_syntax_error_without_unsupported_operator():
+    with pytest.raises(SyntaxError):
+        evaluate("2 +")
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("x + 1", "Unknown name 'x'"),
+    ("__builtins__", "Unknown name '__builtins__'"),
+    ("__import__('os')", "Unknown function: __import__"),
+    ("open('/etc/passwd')", "Unknown function: open"),
+    ("(lambda: 1)()", "Unknown function: lambda: 1"),
+    ("round(2.5, ndigits=0)", "Keyword arguments are not supported"),
+    ("pi.real", "Unsupported syntax: Attribute"),
+    ("(1).__class__", "Unsupported syntax: Attribute"),
+    ("sqrt.__call__(4)", "Unknown function: sqrt.__call__"),
+    ("[1][0]", "Unsupported syntax: Subscript"),
+    ("'a' * 3", "Unsupported literal: 'a'"),
+    ("True + 1", "Unsupported literal: True"),
+])
+def test_names_calls_and_attributes_rejected(expression, message):
+    with pytest.raises(ValueError) as excinfo:
+        compile_expression(expression)
+    assert str(excinfo.value) == message
+
+
+@pytest.mark.parametrize("expression", ["1 / 0", "1 // 0", "5 % 0", "1 / (2 - 2)"])
+def test_division_by_zero(expression):
+    evaluator = compile_expression(expression)
+    with pytest.raises(ZeroDivisionError):
+        evaluator()
@@ -0,0 +1,5 @@
+import os
+
+from database.app import app
+
+app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_ENV') == 'development')
@@ -1,44 +1,67 @@
 import atexit
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
-from flask import Flask, jsonify
+from flask import Flask
+from flask_compress import Compress
 
-from database.db import close_db
+from database.db import close_db, close_session, neo4j_conn
+from database.errors import ERR_INTERNAL
 from database.routes import nodes_bp, relationships_bp, queries_bp, utils_bp
+from database.serialization import Neo4jJSONProvider, json_response, raw_json_response
+
+LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# Records are formatted by the thread that logs them; only the stdout write goes to the listener
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.json = Neo4jJSONProvider(app)
+
+    # List and query responses are large, repetitive JSON; small bodies aren't worth the CPU
+    app.config.update(
+        COMPRESS_ALGORITHM='gzip',
+        COMPRESS_ALGORITHM_STREAMING='gzip',
+        COMPRESS_MIN_SIZE=500,
+        COMPRESS_MIMETYPES=['application/json']
+    )
+    Compress(app)
 
     app.register_blueprint(nodes_bp)
     app.register_blueprint(relationships_bp)
     app.register_blueprint(queries_bp)
     app.register_blueprint(utils_bp)
 
+    app.teardown_appcontext(close_session)
+
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}", exc_info=True)
-        return jsonify({"error": "Internal server error"}), 500
+        logger.error("Internal server error: %s", error, exc_info=True)
+        return raw_json_response(ERR_INTERNAL, 500)
 
     @app.errorhandler(Exception)
     def handle_exception(error):
-        logger.error(f"Unhandled exception: {error}", exc_info=True)
-        return jsonify({"error": "Internal server error", "type": type(error).__name__}), 500
+        logger.error("Unhandled exception: %s", error, exc_info=True)
+        return json_response({"error": "Internal server error", "type": type(error).__name__}, 500)
 
     return app
 
 
 app = create_app()
+neo4j_conn.warm_up()
 atexit.register(close_db)
-
-
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
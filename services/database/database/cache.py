@@ -0,0 +1,119 @@
+"""Redis cache-aside layer for read endpoints"""
+import logging
+import os
+import time
+from typing import Any
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL: str | None = os.getenv('REDIS_URL')
+CACHE_TTL: int = int(os.getenv('CACHE_TTL', '120'))
+
+# Every cached read of the graph is stored along with the graph generation it was read
+# at. A write bumps the generation, which retires all of them with one O(1) INCR instead
+# of a keyspace SCAN, and a read that raced the write can no longer store its stale body
+GRAPH_GENERATION_KEY = "graph:generation"
+
+# Reads the generation and the entry in one round trip. A missing generation (e.g. one
+# evicted under maxmemory) restarts from the clock, above any value used before it
+_GET_GRAPH_SCRIPT = """
+local generation = redis.call('GET', KEYS[1])
+if not generation then
+    generation = ARGV[1]
+    redis.call('SET', KEYS[1], generation)
+end
+return {generation, redis.call('GET', KEYS[2])}
+"""
+
+# Compare-and-set: store the entry only if no write has happened since it was read
+_SET_GRAPH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[1] .. ':' .. ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+_INVALIDATE_GRAPH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('INCR', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+return redis.call('GET', KEYS[1])
+"""
+
+
+class RedisCache:
+    def __init__(self, url: str | None) -> None:
+        self._client: redis.Redis | None = None
+        if url:
+            pool = redis.ConnectionPool.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+            self._client = redis.Redis(connection_pool=pool)
+            self._get_graph = self._client.register_script(_GET_GRAPH_SCRIPT)
+            self._set_graph = self._client.register_script(_SET_GRAPH_SCRIPT)
+            self._invalidate_graph = self._client.register_script(_INVALIDATE_GRAPH_SCRIPT)
+
+    def get_graph(self, key: str) -> tuple[bytes | None, bytes | None]:
+        """Return the current graph generation, and the key's body if it was cached at it
+
+        The generation is None when Redis is unavailable; pass it back to set_graph as is.
+        """
+        if self._client is None:
+            return None, None
+        try:
+            generation, value = self._get_graph(keys=[GRAPH_GENERATION_KEY, key], args=[time.time_ns()])
+        except redis.RedisError as e:
+            logger.warning("Cache get failed for %s: %s", key, e)
+            return None, None
+        if value is None:
+            return generation, None
+        stored, _, body = value.partition(b':')
+        return generation, body if stored == generation else None
+
+    def set_graph(self, key: str, value: bytes, generation: bytes | None, ttl: int = CACHE_TTL) -> None:
+        """Store a body read at the given generation, unless a write has bumped it since"""
+        if self._client is None or generation is None:
+            return
+        try:
+            self._set_graph(keys=[GRAPH_GENERATION_KEY, key], args=[generation, ttl, value])
+        except redis.RedisError as e:
+            logger.warning("Cache set failed for %s: %s", key, e)
+
+    def invalidate_graph(self) -> bytes | None:
+        """Retire every cached read of the graph and return the new generation"""
+        if self._client is None:
+            return None
+        try:
+            return self._invalidate_graph(keys=[GRAPH_GENERATION_KEY], args=[time.time_ns()])
+        except redis.RedisError as e:
+            logger.warning("Cache invalidation failed: %s", e)
+            return None
+
+    def clear(self) -> None:
+        if self._client is None:
+            return
+        try:
+            self._client.flushdb()
+        except redis.RedisError as e:
+            logger.warning("Cache clear failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        if self._client is None:
+            return {"enabled": False}
+        try:
+            info = self._client.info("stats")
+            return {
+                "enabled": True,
+                "keys": self._client.dbsize(),
+                "hits": info.get("keyspace_hits", 0),
+                "misses": info.get("keyspace_misses", 0),
+            }
+        except redis.RedisError as e:
+            logger.warning("Cache stats failed: %s", e)
+            return {"enabled": True, "error": str(e)}
+
+
+cache: RedisCache = RedisCache(REDIS_URL)
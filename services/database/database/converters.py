@@ -0,0 +1,30 @@
+"""Neo4j graph value to dict converters
+
+Kept free of Flask and session imports so the Docker image can compile this
+module with mypyc. Outside the image the plain Python module is imported.
+"""
+from typing import Any
+
+from neo4j.graph import Node, Relationship
+
+
+def node_to_dict(node: Node) -> dict[str, Any]:
+    # element_id is already a str, and orjson serializes the labels tuple as an array
+    return {
+        "id": node.element_id,
+        "labels": tuple(node.labels),
+        "properties": dict(node)
+    }
+
+
+def relationship_to_dict(relationship: Relationship) -> dict[str, Any]:
+    # Relationships read from a result always carry both endpoints
+    start_node, end_node = relationship.nodes
+    assert start_node is not None and end_node is not None
+    return {
+        "id": relationship.element_id,
+        "type": relationship.type,
+        "start_node_id": start_node.element_id,
+        "end_node_id": end_node.element_id,
+        "properties": dict(relationship)
+    }
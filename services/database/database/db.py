@@ -1,8 +1,29 @@
+import logging
 import os
-from typing import Any
+from typing import Any, Iterator
 
-from neo4j import GraphDatabase, Driver
-from neo4j.graph import Node, Relationship
+from flask import g
+from neo4j import READ_ACCESS, WRITE_ACCESS, GraphDatabase, Driver, ManagedTransaction, Record, Session
+from neo4j.exceptions import DriverError, Neo4jError
+
+from database.converters import node_to_dict, relationship_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Cypher projections with the same shape as node_to_dict / relationship_to_dict (for
+# variables n and r), so list endpoints can serialize rows without converting them
+NODE_MAP = "{id: elementId(n), labels: labels(n), properties: properties(n)}"
+RELATIONSHIP_MAP = (
+    "{id: elementId(r), type: type(r), start_node_id: elementId(startNode(r)), "
+    "end_node_id: elementId(endNode(r)), properties: properties(r)}"
+)
+
+# Person.name and File.filename are the fileshare service's lookup keys; without these
+# every lookup is a label scan. The constraint also backs Person.name with an index
+SCHEMA_STATEMENTS: tuple[str, ...] = (
+    "CREATE CONSTRAINT person_name_unique IF NOT EXISTS FOR (p:Person) REQUIRE p.name IS UNIQUE",
+    "CREATE INDEX file_filename IF NOT EXISTS FOR (f:File) ON (f.filename)",
+)
 
 
 class Neo4jConnection:
@@ -11,6 +32,10 @@ class Neo4jConnection:
         self._uri: str = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
         self._user: str = os.getenv('NEO4J_USER', 'neo4j')
         self._password: str = os.getenv('NEO4J_PASSWORD', 'password')
+        self._pool_size: int = int(os.getenv('NEO4J_POOL_SIZE', '256'))
+        self._pool_timeout: float = float(os.getenv('NEO4J_POOL_TIMEOUT', '5'))
+        # Naming the database saves each new session a home-database lookup
+        self.database: str = os.getenv('NEO4J_DATABASE', 'neo4j')
 
     def get_driver(self) -> Driver:
         if self._driver is None:
@@ -18,12 +43,38 @@ class Neo4jConnection:
                 self._uri,
                 auth=(self._user, self._password),
                 max_connection_lifetime=3600,
-                max_connection_pool_size=50,
-                connection_timeout=30,
-                keep_alive=True
+                max_connection_pool_size=self._pool_size,
+                # Fail fast instead of queueing for a socket when the pool is exhausted
+                connection_acquisition_timeout=self._pool_timeout,
+                # Only ping pooled connections that have been idle for a while
+                liveness_check_timeout=30,
+                # Neo4j is on the local compose network; a connect that takes longer is a dead host
+                connection_timeout=10,
+                keep_alive=True,
+                fetch_size=1000,
+                max_transaction_retry_time=15
             )
         return self._driver
 
+    def warm_up(self) -> None:
+        """Open a pooled connection up front so the first request skips the Bolt handshake"""
+        try:
+            self.get_driver().verify_connectivity()
+        except (DriverError, Neo4jError, OSError) as e:
+            logger.warning("Neo4j is not reachable yet, connecting on first request: %s", e)
+            return
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        """Create the constraints and indexes in SCHEMA_STATEMENTS if they are missing"""
+        with self.get_driver().session(database=self.database) as session:
+            for statement in SCHEMA_STATEMENTS:
+                try:
+                    session.run(statement).consume()
+                except (DriverError, Neo4jError, OSError) as e:
+                    # e.g. existing duplicate names, or another worker creating it concurrently
+                    logger.warning("Could not apply schema statement %r: %s", statement, e)
+
     def close(self) -> None:
         if self._driver is not None:
             self._driver.close()
@@ -41,19 +92,68 @@ def close_db() -> None:
     neo4j_conn.close()
 
 
-def node_to_dict(node: Node) -> dict[str, Any]:
-    return {
-        "id": str(node.element_id),
-        "labels": list(node.labels),
-        "properties": dict(node)
-    }
+# Request-scoped sessions per access mode, stored on flask.g
+_SESSION_KEYS: dict[str, str] = {
+    WRITE_ACCESS: '_neo4j_session',
+    READ_ACCESS: '_neo4j_read_session',
+}
+
+
+def get_session(access_mode: str = WRITE_ACCESS) -> Session:
+    """Return the Neo4j session for the current request, opening it on first use
+
+    Managed transactions pick their own access mode; the session's default only
+    matters for auto-commit queries run directly on it, which READ_ACCESS routes
+    to read replicas.
+    """
+    key = _SESSION_KEYS[access_mode]
+    session: Session | None = g.get(key)
+    if session is None:
+        session = get_db().session(database=neo4j_conn.database, default_access_mode=access_mode)
+        setattr(g, key, session)
+    return session
+
+
+def close_session(exception: BaseException | None = None) -> None:
+    for key in _SESSION_KEYS.values():
+        session: Session | None = g.pop(key, None)
+        if session is not None:
+            session.close()
+
+
+def _fetch_all(tx: ManagedTransaction, query: str, parameters: dict[str, Any]) -> list[Record]:
+    return list(tx.run(query, parameters))
+
+
+def _fetch_values(tx: ManagedTransaction, query: str, parameters: dict[str, Any]) -> list[Any]:
+    return tx.run(query, parameters).value()
+
+
+def run_read(query: str, parameters: dict[str, Any] | None = None) -> list[Record]:
+    """Run a read query in a managed transaction (retried, routed to readers)"""
+    return get_session().execute_read(_fetch_all, query, parameters or {})
+
+
+def read_values(query: str, parameters: dict[str, Any] | None = None) -> list[Any]:
+    """Like run_read, for single-column queries: returns the column's values directly"""
+    return get_session().execute_read(_fetch_values, query, parameters or {})
+
+
+def run_write(query: str, parameters: dict[str, Any] | None = None) -> list[Record]:
+    """Run a write query in a managed transaction (retried on transient errors)"""
+    return get_session().execute_write(_fetch_all, query, parameters or {})
+
 
+def stream_read(query: str, parameters: dict[str, Any] | None = None) -> Iterator[Record]:
+    """Start a read query and lazily yield its records as the server streams them
 
-def relationship_to_dict(relationship: Relationship) -> dict[str, Any]:
-    return {
-        "id": str(relationship.element_id),
-        "type": relationship.type,
-        "start_node_id": str(relationship.start_node.element_id),
-        "end_node_id": str(relationship.end_node.element_id),
-        "properties": dict(relationship)
-    }
+    The first batch of records (up to the driver's fetch_size) is pulled here, so
+    errors from starting the query or producing that batch are raised in the view,
+    where handle_db_errors turns them into a JSON error response. An error that only
+    arrives with a later batch ends the stream part-way through the body. Reads are
+    not retried; the iterator has to be drained within the request context since it
+    uses the request's session.
+    """
+    result = get_session(READ_ACCESS).run(query, parameters or {})
+    result.peek()
+    return iter(result)
@@ -0,0 +1,36 @@
+"""Prebuilt JSON bodies for the common error responses, and the shared view error handler"""
+import logging
+from functools import wraps
+from typing import Any, Callable, TypeVar, cast
+
+from flask import Response
+from neo4j.exceptions import Neo4jError
+
+from database.serialization import dumps, error_response, raw_json_response
+
+logger = logging.getLogger(__name__)
+View = TypeVar('View', bound=Callable[..., tuple[Response, int]])
+
+ERR_NO_DATA: bytes = dumps({"error": "No data provided"})
+ERR_NO_PROPERTIES: bytes = dumps({"error": "No properties provided"})
+ERR_NO_QUERY: bytes = dumps({"error": "No query provided"})
+ERR_NODE_NOT_FOUND: bytes = dumps({"error": "Node not found"})
+ERR_RELATIONSHIP_NOT_FOUND: bytes = dumps({"error": "Relationship not found"})
+ERR_INTERNAL: bytes = dumps({"error": "Internal server error"})
+
+
+def handle_db_errors(action: str) -> Callable[[View], View]:
+    """Log errors escaping a view (e.g. "Neo4j error <action>: ...") and return a JSON 500"""
+    def decorator(view: View) -> View:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> tuple[Response, int]:
+            try:
+                return view(*args, **kwargs)
+            except Neo4jError as e:
+                logger.error("Neo4j error %s: %s", action, e, exc_info=True)
+                return error_response(f"Database error: {e}", 500)
+            except Exception as e:
+                logger.error("Unexpected error %s: %s", action, e, exc_info=True)
+                return raw_json_response(ERR_INTERNAL, 500)
+        return cast(View, wrapper)
+    return decorator
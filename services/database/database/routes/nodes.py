@@ -1,18 +1,67 @@
 """Node CRUD operation routes"""
+from functools import lru_cache
 from typing import Any
 
-from flask import Blueprint, request, jsonify
-from neo4j.exceptions import Neo4jError
+from flask import Blueprint, request
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from database.db import get_db, node_to_dict
+from database.cache import cache
+from database.db import NODE_MAP, node_to_dict, read_values, run_write, stream_read
+from database.errors import ERR_NODE_NOT_FOUND, ERR_NO_DATA, ERR_NO_PROPERTIES, handle_db_errors
+from database.serialization import (
+    dumps, error_response, json_response, load_json, raw_json_response, stream_json_list
+)
 from database.validation import validate_identifier, validate_identifiers
 
 
 nodes_bp = Blueprint('nodes', __name__, url_prefix='/nodes')
 
+# Static query text is built once; labels are passed as parameters through APOC
+# so every label combination shares a single cached plan
+_Q_CREATE_NODE = "CALL apoc.create.node($labels, $properties) YIELD node RETURN node AS n"
+_Q_CREATE_NODES = """
+UNWIND $rows AS row
+CALL apoc.create.node(row.labels, row.properties) YIELD node
+RETURN node AS n
+"""
+_Q_GET_NODE = "MATCH (n) WHERE elementId(n) = $node_id RETURN n"
+_Q_UPDATE_NODE = """
+MATCH (n) WHERE elementId(n) = $node_id
+SET n += $properties
+RETURN n
+"""
+_Q_DELETE_NODE = """
+MATCH (n) WHERE elementId(n) = $node_id
+DETACH DELETE n
+RETURN count(n) as deleted_count
+"""
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+
+# Labels are validated identifiers, so the same few strings repeat; build each
+# query once and hand the driver an identical string every time. Both return
+# rows already shaped like node_to_dict.
+@lru_cache(maxsize=1024)
+def _label_query(label: str) -> str:
+    return f"MATCH (n:{label}) RETURN {NODE_MAP} AS n"
+
+
+@lru_cache(maxsize=1024)
+def _label_page_query(label: str) -> str:
+    # Cursor pagination over elementId. No index serves this order, so every page filters
+    # and sorts all nodes with the label: O(n) in the label's size per page. The order is
+    # stable for existing nodes but isn't insertion order; nodes created mid-walk can be missed
+    return (
+        f"MATCH (n:{label}) WHERE elementId(n) > $after "
+        f"WITH n ORDER BY elementId(n) LIMIT $limit "
+        f"RETURN {NODE_MAP} AS n"
+    )
+
 
 @nodes_bp.route('', methods=['POST'])
+@handle_db_errors("creating node")
 def create_node() -> tuple[WerkzeugResponse, int]:
     """Create a new node with labels and properties
 
@@ -25,64 +74,101 @@ def create_node() -> tuple[WerkzeugResponse, int]:
         }
     }
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data:
-        return jsonify({"error": "No data provided"}), 400
+        return raw_json_response(ERR_NO_DATA, 400)
 
     labels: list[str] = data.get("labels", [])
     properties: dict[str, Any] = data.get("properties", {})
 
     if not labels:
-        return jsonify({"error": "At least one label is required"}), 400
+        return error_response("At least one label is required", 400)
 
     # Validate labels to prevent Cypher injection
     is_valid, error = validate_identifiers(labels, "label")
     if not is_valid:
-        return jsonify({"error": error}), 400
+        return error_response(error, 400)
+
+    records = run_write(_Q_CREATE_NODE, {"labels": labels, "properties": properties})
+    record = records[0] if records else None
+
+    if record:
+        node = record["n"]
+        body = dumps(node_to_dict(node))
+        generation = cache.invalidate_graph()
+        # Write-through so the first GET of a new node is already a hit
+        cache.set_graph(f"node:{node.element_id}", body, generation)
+        return raw_json_response(body, 201)
+
+    return error_response("Failed to create node", 500)
+
+
+@nodes_bp.route('/bulk', methods=['POST'])
+@handle_db_errors("creating nodes")
+def create_nodes() -> tuple[WerkzeugResponse, int]:
+    """Create many nodes in a single transaction
+
+    Expected JSON body:
+    {
+        "nodes": [
+            {"labels": ["Person"], "properties": {"name": "John"}},
+            {"labels": ["Person", "Employee"], "properties": {"name": "Jane"}}
+        ]
+    }
+    """
+    data: dict[str, Any] | None = load_json()
+
+    if not data:
+        return raw_json_response(ERR_NO_DATA, 400)
+
+    nodes: list[dict[str, Any]] = data.get("nodes", [])
+
+    if not nodes:
+        return error_response("At least one node is required", 400)
+
+    rows: list[dict[str, Any]] = []
+    for node in nodes:
+        labels: list[str] = node.get("labels", [])
+        if not labels:
+            return error_response("At least one label is required", 400)
 
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            # Build Cypher query dynamically (safe after validation)
-            labels_str = ':'.join(labels)
-            query = f"CREATE (n:{labels_str} $properties) RETURN n"
-            result = session.run(query, properties=properties)
-            record = result.single()
+        # Validate labels to prevent Cypher injection
+        is_valid, error = validate_identifiers(labels, "label")
+        if not is_valid:
+            return error_response(error, 400)
 
-            if record:
-                node = record["n"]
-                return jsonify(node_to_dict(node)), 201
+        rows.append({"labels": labels, "properties": node.get("properties", {})})
 
-            return jsonify({"error": "Failed to create node"}), 500
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    # One UNWIND query: a single round trip and plan for the whole batch
+    records = run_write(_Q_CREATE_NODES, {"rows": rows})
+    created = [node_to_dict(record["n"]) for record in records]
+
+    cache.invalidate_graph()
+    return json_response({"nodes": created, "count": len(created)}, 201)
 
 
 @nodes_bp.route('/<node_id>', methods=['GET'])
+@handle_db_errors("getting node")
 def get_node(node_id: str) -> tuple[WerkzeugResponse, int]:
     """Get a node by ID"""
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = "MATCH (n) WHERE elementId(n) = $node_id RETURN n"
-            result = session.run(query, node_id=node_id)
-            record = result.single()
+    cache_key = f"node:{node_id}"
+    generation, cached = cache.get_graph(cache_key)
+    if cached is not None:
+        return raw_json_response(cached)
+
+    nodes = read_values(_Q_GET_NODE, {"node_id": node_id})
 
-            if record:
-                node = record["n"]
-                return jsonify(node_to_dict(node)), 200
+    if nodes:
+        body = dumps(node_to_dict(nodes[0]))
+        cache.set_graph(cache_key, body, generation)
+        return raw_json_response(body)
 
-            return jsonify({"error": "Node not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    return raw_json_response(ERR_NODE_NOT_FOUND, 404)
 
 
 @nodes_bp.route('/<node_id>', methods=['PUT'])
+@handle_db_errors("updating node")
 def update_node(node_id: str) -> tuple[WerkzeugResponse, int]:
     """Update a node's properties
 
@@ -94,76 +180,78 @@ def update_node(node_id: str) -> tuple[WerkzeugResponse, int]:
         }
     }
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data or "properties" not in data:
-        return jsonify({"error": "No properties provided"}), 400
+        return raw_json_response(ERR_NO_PROPERTIES, 400)
 
     properties: dict[str, Any] = data["properties"]
 
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = """
-            MATCH (n) WHERE elementId(n) = $node_id
-            SET n += $properties
-            RETURN n
-            """
-            result = session.run(query, node_id=node_id, properties=properties)
-            record = result.single()
+    records = run_write(_Q_UPDATE_NODE, {"node_id": node_id, "properties": properties})
+    record = records[0] if records else None
 
-            if record:
-                node = record["n"]
-                return jsonify(node_to_dict(node)), 200
+    if record:
+        node = record["n"]
+        body = dumps(node_to_dict(node))
+        cache.invalidate_graph()
+        return raw_json_response(body)
 
-            return jsonify({"error": "Node not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    return raw_json_response(ERR_NODE_NOT_FOUND, 404)
 
 
 @nodes_bp.route('/<node_id>', methods=['DELETE'])
+@handle_db_errors("deleting node")
 def delete_node(node_id: str) -> tuple[WerkzeugResponse, int]:
     """Delete a node"""
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = """
-            MATCH (n) WHERE elementId(n) = $node_id
-            DETACH DELETE n
-            RETURN count(n) as deleted_count
-            """
-            result = session.run(query, node_id=node_id)
-            record = result.single()
-
-            if record and record["deleted_count"] > 0:
-                return jsonify({"message": "Node deleted successfully"}), 200
-
-            return jsonify({"error": "Node not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    records = run_write(_Q_DELETE_NODE, {"node_id": node_id})
+    record = records[0] if records else None
+
+    if record and record["deleted_count"] > 0:
+        cache.invalidate_graph()
+        return json_response({"message": "Node deleted successfully"}, 200)
+
+    return raw_json_response(ERR_NODE_NOT_FOUND, 404)
 
 
 @nodes_bp.route('/label/<label>', methods=['GET'])
+@handle_db_errors("getting nodes by label")
 def get_nodes_by_label(label: str) -> tuple[WerkzeugResponse, int]:
-    """Get all nodes with a specific label"""
+    """Get all nodes with a specific label
+
+    Query params (optional, switch to elementId cursor pagination; see _label_page_query):
+    - limit: page size, 1 to MAX_PAGE_SIZE (default: DEFAULT_PAGE_SIZE)
+    - after: the next_cursor returned by the previous page
+    """
     # Validate label to prevent Cypher injection
     is_valid, error = validate_identifier(label, "label")
     if not is_valid:
-        return jsonify({"error": error}), 400
-
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = f"MATCH (n:{label}) RETURN n"
-            result = session.run(query)
-            nodes = [node_to_dict(record["n"]) for record in result]
-
-            return jsonify({"nodes": nodes, "count": len(nodes)}), 200
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(error, 400)
+
+    if 'limit' in request.args or 'after' in request.args:
+        return _get_nodes_page(label)
+
+    cache_key = f"label:{label}"
+    generation, cached = cache.get_graph(cache_key)
+    if cached is not None:
+        return raw_json_response(cached)
+
+    records = stream_read(_label_query(label))
+    # Records are tuples; unpacking the single column skips Record.__getitem__ per row
+    nodes = (node for node, in records)
+
+    return stream_json_list("nodes", nodes, on_complete=lambda body: cache.set_graph(cache_key, body, generation))
+
+
+def _get_nodes_page(label: str) -> tuple[WerkzeugResponse, int]:
+    limit_arg: str = request.args.get('limit', str(DEFAULT_PAGE_SIZE))
+    after: str = request.args.get('after', '')
+
+    limit = int(limit_arg) if limit_arg.isascii() and limit_arg.isdigit() else 0
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return error_response(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}", 400)
+
+    nodes = read_values(_label_page_query(label), {"after": after, "limit": limit})
+    # A short page means there is nothing after it
+    next_cursor = nodes[-1]["id"] if len(nodes) == limit else None
+
+    return json_response({"nodes": nodes, "count": len(nodes), "next_cursor": next_cursor})
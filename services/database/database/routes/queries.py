@@ -1,19 +1,109 @@
 """Query operation routes (Cypher execution, path finding, node relationships)"""
-import logging
+import hashlib
+import re
+from functools import lru_cache
 from typing import Any
 
-from flask import Blueprint, request, jsonify
-from neo4j.exceptions import Neo4jError
+import orjson
+from flask import Blueprint, request
+from neo4j import Record
+from neo4j.graph import Node, Relationship
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from database.db import get_db, node_to_dict, relationship_to_dict
+from database.cache import cache
+from database.db import (
+    RELATIONSHIP_MAP, node_to_dict, read_values, relationship_to_dict, run_write, stream_read
+)
+from database.errors import ERR_NO_DATA, ERR_NO_QUERY, handle_db_errors
+from database.serialization import (
+    dumps, error_response, json_response, load_json, raw_json_response, stream_json_list
+)
 from database.validation import validate_identifier, validate_identifiers
 
-logger = logging.getLogger(__name__)
 queries_bp = Blueprint('queries', __name__)
 
+# One parameterized query for every direction/type combination, so all of them
+# share a single plan. DISTINCT keeps a self-loop from matching twice.
+_Q_NODE_RELATIONSHIPS = f"""
+MATCH (n) WHERE elementId(n) = $node_id
+MATCH (n)-[r]-()
+WHERE ($direction = 'all'
+       OR ($direction = 'outgoing' AND startNode(r) = n)
+       OR ($direction = 'incoming' AND endNode(r) = n))
+  AND ($rel_type IS NULL OR type(r) = $rel_type)
+WITH DISTINCT r
+RETURN {RELATIONSHIP_MAP} AS r
+"""
+
+# String literals and quoted identifiers are matched first so their contents are left alone
+_CYPHER_TOKEN_PATTERN = re.compile(
+    r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|(?:\s|//[^\n]*|/\*.*?\*/)+""",
+    re.DOTALL
+)
+
+
+def _normalize_token(match: re.Match[str]) -> str:
+    token = match.group()
+    return token if token[0] in "'\"`" else " "
+
+
+# Conservative read-only check: anything that might write (including procedure
+# calls) falls through to the write path, which is always correct
+_READ_ONLY_START_PATTERN = re.compile(r'(?:OPTIONAL\s+)?MATCH\b|RETURN\b|WITH\b|UNWIND\b', re.IGNORECASE)
+_WRITE_KEYWORD_PATTERN = re.compile(r'\b(?:CREATE|MERGE|SET|DELETE|REMOVE|FOREACH|CALL|LOAD)\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _is_read_only(query: str) -> bool:
+    return bool(_READ_ONLY_START_PATTERN.match(query)) and not _WRITE_KEYWORD_PATTERN.search(query)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_query(query: str) -> str:
+    """Strip comments and collapse whitespace so equivalent queries share one server-side plan"""
+    return _CYPHER_TOKEN_PATTERN.sub(_normalize_token, query).strip()
+
+
+# Breadth-first expansion that stops at the target, never revisits a node and
+# returns the first (i.e. shortest) path found within max_depth hops
+_Q_FIND_PATH = """
+MATCH (a), (b)
+WHERE elementId(a) = $from_node AND elementId(b) = $to_node
+CALL apoc.path.expandConfig(a, {
+    relationshipFilter: $rel_filter,
+    minLevel: 1,
+    maxLevel: $max_depth,
+    terminatorNodes: [b],
+    bfs: true,
+    uniqueness: 'NODE_GLOBAL',
+    limit: 1
+}) YIELD path
+RETURN path
+"""
+
+
+def _convert_value(value: Any) -> Any:
+    # Relationships are instances of per-type subclasses, so match with isinstance
+    if isinstance(value, Node):
+        return node_to_dict(value)
+    if isinstance(value, Relationship):
+        return relationship_to_dict(value)
+    return value
+
+
+def _record_to_dict(record: Record) -> dict[str, Any]:
+    """Convert a record's Neo4j nodes and relationships to dicts"""
+    return {key: _convert_value(value) for key, value in record.items()}
+
+
+def _cypher_cache_key(query: str, parameters: dict[str, Any]) -> str:
+    digest = hashlib.blake2b(query.encode(), digest_size=16)
+    digest.update(orjson.dumps(parameters, option=orjson.OPT_SORT_KEYS))
+    return f"cypher:{digest.hexdigest()}"
+
 
 @queries_bp.route('/nodes/<node_id>/relationships', methods=['GET'])
+@handle_db_errors("getting node relationships")
 def get_node_relationships(node_id: str) -> tuple[WerkzeugResponse, int]:
     """Get all relationships for a specific node
 
@@ -28,40 +118,27 @@ def get_node_relationships(node_id: str) -> tuple[WerkzeugResponse, int]:
     if rel_type:
         is_valid, error = validate_identifier(rel_type, "relationship type")
         if not is_valid:
-            return jsonify({"error": error}), 400
-
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            # Build query based on direction and type
-            if direction == "incoming":
-                pattern = "<-[r]-()"
-            elif direction == "outgoing":
-                pattern = "-[r]->()"
-            else:  # all
-                pattern = "-[r]-()"
-
-            if rel_type:
-                pattern = pattern.replace("[r]", f"[r:{rel_type}]")
-
-            query = f"""
-            MATCH (n){pattern}
-            WHERE elementId(n) = $node_id
-            RETURN r
-            """
-            result = session.run(query, node_id=node_id)
-            relationships = [relationship_to_dict(record["r"]) for record in result]
-
-            return jsonify({"relationships": relationships, "count": len(relationships)}), 200
-    except Neo4jError as e:
-        logger.error(f"Neo4j error getting node relationships: {str(e)}", exc_info=True)
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error getting node relationships: {str(e)}", exc_info=True)
-        return jsonify({"error": "Internal server error"}), 500
+            return error_response(error, 400)
+
+    cache_key = f"noderels:{node_id}:{direction}:{rel_type or ''}"
+    generation, cached = cache.get_graph(cache_key)
+    if cached is not None:
+        return raw_json_response(cached)
+
+    relationships = read_values(_Q_NODE_RELATIONSHIPS, {
+        "node_id": node_id,
+        # Unknown directions fall back to "all"
+        "direction": direction if direction in ("incoming", "outgoing") else "all",
+        "rel_type": rel_type or None
+    })
+
+    body = dumps({"relationships": relationships, "count": len(relationships)})
+    cache.set_graph(cache_key, body, generation)
+    return raw_json_response(body)
 
 
 @queries_bp.route('/query/cypher', methods=['POST'])
+@handle_db_errors("executing Cypher query")
 def execute_cypher() -> tuple[WerkzeugResponse, int]:
     """Execute a custom Cypher query
 
@@ -70,46 +147,49 @@ def execute_cypher() -> tuple[WerkzeugResponse, int]:
         "query": "MATCH (n:Person) WHERE n.age > $age RETURN n",
         "parameters": {
             "age": 25
-        }
+        },
+        "cache": false
     }
+
+    Read results are cached unless "cache" is false. Callers that check state right
+    before writing should opt out: writes made straight to Neo4j never reach the cache.
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data or 'query' not in data:
-        return jsonify({"error": "No query provided"}), 400
+        return raw_json_response(ERR_NO_QUERY, 400)
 
-    query: str = data['query']
+    query: str = _normalize_query(data['query'])
     parameters: dict[str, Any] = data.get('parameters', {})
 
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            result = session.run(query, **parameters)
-            records = []
-
-            for record in result:
-                record_dict: dict[str, Any] = {}
-                for key in record.keys():
-                    value = record[key]
-                    # Convert Neo4j types to dicts
-                    if hasattr(value, 'labels'):  # Node
-                        record_dict[key] = node_to_dict(value)
-                    elif hasattr(value, 'type') and hasattr(value, 'start_node'):  # Relationship
-                        record_dict[key] = relationship_to_dict(value)
-                    else:
-                        record_dict[key] = value
-                records.append(record_dict)
-
-            return jsonify({"results": records, "count": len(records)}), 200
-    except Neo4jError as e:
-        logger.error(f"Neo4j error executing Cypher query: {str(e)}", exc_info=True)
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error executing Cypher query: {str(e)}", exc_info=True)
-        return jsonify({"error": "Internal server error"}), 500
+    if not _is_read_only(query):
+        # Writes are materialized in a managed transaction: it is retried on transient
+        # errors, and any failure surfaces before a status line has been sent
+        records = run_write(query, parameters)
+        body = dumps({"results": [_record_to_dict(record) for record in records], "count": len(records)})
+        # An arbitrary write can touch any graph entry, so retire every cached read of the graph
+        cache.invalidate_graph()
+        return raw_json_response(body)
+
+    cache_key = _cypher_cache_key(query, parameters)
+    generation: bytes | None = None
+    if data.get('cache') is not False:
+        generation, cached = cache.get_graph(cache_key)
+        if cached is not None:
+            return raw_json_response(cached)
+
+    # Plain reads can go to a read replica
+    records = stream_read(query, parameters)
+    return stream_json_list(
+        "results",
+        (_record_to_dict(record) for record in records),
+        # No generation means caching is off for this read, so skip collecting the body
+        on_complete=(lambda body: cache.set_graph(cache_key, body, generation)) if generation is not None else None
+    )
 
 
 @queries_bp.route('/query/path', methods=['POST'])
+@handle_db_errors("finding path")
 def find_path() -> tuple[WerkzeugResponse, int]:
     """Find path between two nodes
 
@@ -121,10 +201,10 @@ def find_path() -> tuple[WerkzeugResponse, int]:
         "relationship_types": ["KNOWS", "WORKS_WITH"]
     }
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data:
-        return jsonify({"error": "No data provided"}), 400
+        return raw_json_response(ERR_NO_DATA, 400)
 
     from_node: str | None = data.get("from_node")
     to_node: str | None = data.get("to_node")
@@ -132,53 +212,36 @@ def find_path() -> tuple[WerkzeugResponse, int]:
     rel_types: list[str] | None = data.get("relationship_types")
 
     if not from_node or not to_node:
-        return jsonify({"error": "from_node and to_node are required"}), 400
+        return error_response("from_node and to_node are required", 400)
 
     # Validate max_depth to prevent resource exhaustion
     if not isinstance(max_depth, int) or max_depth < 1 or max_depth > 15:
-        return jsonify({"error": "max_depth must be an integer between 1 and 15"}), 400
+        return error_response("max_depth must be an integer between 1 and 15", 400)
 
     # Validate relationship types if provided
     if rel_types:
         is_valid, error = validate_identifiers(rel_types, "relationship type")
         if not is_valid:
-            return jsonify({"error": error}), 400
-
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            # Build relationship type filter (safe after validation)
-            rel_filter = ""
-            if rel_types:
-                rel_filter = ":" + "|".join(rel_types)
-
-            query = f"""
-            MATCH path = shortestPath(
-                (a)-[{rel_filter}*..{max_depth}]-(b)
-            )
-            WHERE elementId(a) = $from_node AND elementId(b) = $to_node
-            RETURN path
-            """
-            result = session.run(query, from_node=from_node, to_node=to_node)
-            record = result.single()
-
-            if record:
-                path = record["path"]
-                nodes = [node_to_dict(node) for node in path.nodes]
-                relationships = [relationship_to_dict(rel) for rel in path.relationships]
-
-                return jsonify({
-                    "path": {
-                        "nodes": nodes,
-                        "relationships": relationships,
-                        "length": len(relationships)
-                    }
-                }), 200
-
-            return jsonify({"error": "No path found between the nodes"}), 404
-    except Neo4jError as e:
-        logger.error(f"Neo4j error finding path: {str(e)}", exc_info=True)
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error finding path: {str(e)}", exc_info=True)
-        return jsonify({"error": "Internal server error"}), 500
+            return error_response(error, 400)
+
+    paths = read_values(_Q_FIND_PATH, {
+        "from_node": from_node,
+        "to_node": to_node,
+        "max_depth": max_depth,
+        # Undirected "A|B" filter; an empty filter follows every type
+        "rel_filter": "|".join(rel_types) if rel_types else ""
+    })
+    if paths:
+        path = paths[0]
+        nodes = [node_to_dict(node) for node in path.nodes]
+        relationships = [relationship_to_dict(rel) for rel in path.relationships]
+
+        return json_response({
+            "path": {
+                "nodes": nodes,
+                "relationships": relationships,
+                "length": len(relationships)
+            }
+        })
+
+    return error_response("No path found between the nodes", 404)
@@ -1,19 +1,49 @@
 """Relationship CRUD operation routes"""
-import logging
+from functools import lru_cache
 from typing import Any
 
-from flask import Blueprint, request, jsonify
-from neo4j.exceptions import Neo4jError
+from flask import Blueprint
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from database.db import get_db, relationship_to_dict
+from database.cache import cache
+from database.db import RELATIONSHIP_MAP, read_values, relationship_to_dict, run_write, stream_read
+from database.errors import ERR_NO_DATA, ERR_NO_PROPERTIES, ERR_RELATIONSHIP_NOT_FOUND, handle_db_errors
+from database.serialization import (
+    dumps, error_response, json_response, load_json, raw_json_response, stream_json_list
+)
 from database.validation import validate_identifier
 
-logger = logging.getLogger(__name__)
 relationships_bp = Blueprint('relationships', __name__, url_prefix='/relationships')
 
+# Static query text is built once; the relationship type is passed as a parameter
+# through APOC so every type shares a single cached plan
+_Q_CREATE_REL = """
+MATCH (a), (b) WHERE elementId(a) = $from_node AND elementId(b) = $to_node
+CALL apoc.create.relationship(a, $rel_type, $properties, b) YIELD rel
+RETURN rel AS r
+"""
+_Q_GET_REL = "MATCH ()-[r]->() WHERE elementId(r) = $relationship_id RETURN r"
+_Q_UPDATE_REL = """
+MATCH ()-[r]->() WHERE elementId(r) = $relationship_id
+SET r += $properties
+RETURN r
+"""
+_Q_DELETE_REL = """
+MATCH ()-[r]->() WHERE elementId(r) = $relationship_id
+DELETE r
+RETURN count(r) as deleted_count
+"""
+
+
+# Types are validated identifiers, so each query string is built once and reused;
+# rows come back already shaped like relationship_to_dict
+@lru_cache(maxsize=1024)
+def _type_query(rel_type: str) -> str:
+    return f"MATCH ()-[r:{rel_type}]->() RETURN {RELATIONSHIP_MAP} AS r"
+
 
 @relationships_bp.route('', methods=['POST'])
+@handle_db_errors("creating relationship")
 def create_relationship() -> tuple[WerkzeugResponse, int]:
     """Create a relationship between two nodes
 
@@ -27,10 +57,10 @@ def create_relationship() -> tuple[WerkzeugResponse, int]:
         }
     }
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data:
-        return jsonify({"error": "No data provided"}), 400
+        return raw_json_response(ERR_NO_DATA, 400)
 
     from_node: str | None = data.get("from_node")
     to_node: str | None = data.get("to_node")
@@ -38,60 +68,53 @@ def create_relationship() -> tuple[WerkzeugResponse, int]:
     properties: dict[str, Any] = data.get("properties", {})
 
     if not from_node or not to_node or not rel_type:
-        return jsonify({"error": "from_node, to_node, and type are required"}), 400
+        return error_response("from_node, to_node, and type are required", 400)
 
     # Validate relationship type to prevent Cypher injection
     is_valid, error = validate_identifier(rel_type, "relationship type")
     if not is_valid:
-        return jsonify({"error": error}), 400
-
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = f"""
-            MATCH (a) WHERE elementId(a) = $from_node
-            MATCH (b) WHERE elementId(b) = $to_node
-            CREATE (a)-[r:{rel_type} $properties]->(b)
-            RETURN r
-            """
-            result = session.run(query, from_node=from_node, to_node=to_node, properties=properties)
-            record = result.single()
-
-            if record:
-                rel = record["r"]
-                return jsonify(relationship_to_dict(rel)), 201
-
-            return jsonify({"error": "Failed to create relationship. Nodes may not exist."}), 404
-    except Neo4jError as e:
-        logger.error(f"Neo4j error creating relationship: {e}", exc_info=True)
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        logger.error(f"Unexpected error creating relationship: {e}", exc_info=True)
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
+        return error_response(error, 400)
+
+    records = run_write(_Q_CREATE_REL, {
+        "from_node": from_node,
+        "to_node": to_node,
+        "rel_type": rel_type,
+        "properties": properties
+    })
+    record = records[0] if records else None
+
+    if record:
+        rel = record["r"]
+        body = dumps(relationship_to_dict(rel))
+        generation = cache.invalidate_graph()
+        # Write-through so the first GET of a new relationship is already a hit
+        cache.set_graph(f"rel:{rel.element_id}", body, generation)
+        return raw_json_response(body, 201)
+
+    return error_response("Failed to create relationship. Nodes may not exist.", 404)
 
 
 @relationships_bp.route('/<relationship_id>', methods=['GET'])
+@handle_db_errors("getting relationship")
 def get_relationship(relationship_id: str) -> tuple[WerkzeugResponse, int]:
     """Get a relationship by ID"""
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = "MATCH ()-[r]->() WHERE elementId(r) = $relationship_id RETURN r"
-            result = session.run(query, relationship_id=relationship_id)
-            record = result.single()
+    cache_key = f"rel:{relationship_id}"
+    generation, cached = cache.get_graph(cache_key)
+    if cached is not None:
+        return raw_json_response(cached)
 
-            if record:
-                rel = record["r"]
-                return jsonify(relationship_to_dict(rel)), 200
+    rels = read_values(_Q_GET_REL, {"relationship_id": relationship_id})
 
-            return jsonify({"error": "Relationship not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    if rels:
+        body = dumps(relationship_to_dict(rels[0]))
+        cache.set_graph(cache_key, body, generation)
+        return raw_json_response(body)
+
+    return raw_json_response(ERR_RELATIONSHIP_NOT_FOUND, 404)
 
 
 @relationships_bp.route('/<relationship_id>', methods=['PUT'])
+@handle_db_errors("updating relationship")
 def update_relationship(relationship_id: str) -> tuple[WerkzeugResponse, int]:
     """Update a relationship's properties
 
@@ -102,76 +125,59 @@ def update_relationship(relationship_id: str) -> tuple[WerkzeugResponse, int]:
         }
     }
     """
-    data: dict[str, Any] | None = request.get_json()
+    data: dict[str, Any] | None = load_json()
 
     if not data or "properties" not in data:
-        return jsonify({"error": "No properties provided"}), 400
+        return raw_json_response(ERR_NO_PROPERTIES, 400)
 
     properties: dict[str, Any] = data["properties"]
 
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = """
-            MATCH ()-[r]->() WHERE elementId(r) = $relationship_id
-            SET r += $properties
-            RETURN r
-            """
-            result = session.run(query, relationship_id=relationship_id, properties=properties)
-            record = result.single()
+    records = run_write(_Q_UPDATE_REL, {"relationship_id": relationship_id, "properties": properties})
+    record = records[0] if records else None
 
-            if record:
-                rel = record["r"]
-                return jsonify(relationship_to_dict(rel)), 200
+    if record:
+        rel = record["r"]
+        body = dumps(relationship_to_dict(rel))
+        cache.invalidate_graph()
+        return raw_json_response(body)
 
-            return jsonify({"error": "Relationship not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    return raw_json_response(ERR_RELATIONSHIP_NOT_FOUND, 404)
 
 
 @relationships_bp.route('/<relationship_id>', methods=['DELETE'])
+@handle_db_errors("deleting relationship")
 def delete_relationship(relationship_id: str) -> tuple[WerkzeugResponse, int]:
     """Delete a relationship"""
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = """
-            MATCH ()-[r]->() WHERE elementId(r) = $relationship_id
-            DELETE r
-            RETURN count(r) as deleted_count
-            """
-            result = session.run(query, relationship_id=relationship_id)
-            record = result.single()
-
-            if record and record["deleted_count"] > 0:
-                return jsonify({"message": "Relationship deleted successfully"}), 200
-
-            return jsonify({"error": "Relationship not found"}), 404
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+    records = run_write(_Q_DELETE_REL, {"relationship_id": relationship_id})
+    record = records[0] if records else None
+
+    if record and record["deleted_count"] > 0:
+        cache.invalidate_graph()
+        return json_response({"message": "Relationship deleted successfully"}, 200)
+
+    return raw_json_response(ERR_RELATIONSHIP_NOT_FOUND, 404)
 
 
 @relationships_bp.route('/type/<rel_type>', methods=['GET'])
+@handle_db_errors("getting relationships by type")
 def get_relationships_by_type(rel_type: str) -> tuple[WerkzeugResponse, int]:
     """Get all relationships of a specific type"""
     # Validate relationship type to prevent Cypher injection
     is_valid, error = validate_identifier(rel_type, "relationship type")
     if not is_valid:
-        return jsonify({"error": error}), 400
-
-    try:
-        driver = get_db()
-        with driver.session() as session:
-            query = f"MATCH ()-[r:{rel_type}]->() RETURN r"
-            result = session.run(query)
-            relationships = [relationship_to_dict(record["r"]) for record in result]
-
-            return jsonify({"relationships": relationships, "count": len(relationships)}), 200
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(error, 400)
+
+    cache_key = f"reltype:{rel_type}"
+    generation, cached = cache.get_graph(cache_key)
+    if cached is not None:
+        return raw_json_response(cached)
+
+    records = stream_read(_type_query(rel_type))
+    # Records are tuples; unpacking the single column skips Record.__getitem__ per row
+    relationships = (rel for rel, in records)
+
+    return stream_json_list(
+        "relationships",
+        relationships,
+        on_complete=lambda body: cache.set_graph(cache_key, body, generation)
+    )
@@ -1,36 +1,103 @@
-from flask import Blueprint, jsonify
-from neo4j.exceptions import Neo4jError
+import logging
+import os
+import time
+from typing import Any
+
+from flask import Blueprint, request
+from neo4j.exceptions import ClientError, DriverError, Neo4jError
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from database.db import get_db
+from database.cache import cache
+from database.db import run_read
+from database.errors import handle_db_errors
+from database.serialization import dumps, json_response, raw_json_response
 
+logger = logging.getLogger(__name__)
 utils_bp = Blueprint('utils', __name__)
 
+# Per-worker copy of the last /stats body, checked before Redis; counts change slowly
+STATS_CACHE_TTL: float = float(os.getenv('STATS_CACHE_TTL', '30'))
+_stats_cache: tuple[float, bytes] | None = None
+
+
+# APOC reads the counts from the store's count metadata instead of scanning the graph
+_Q_STATS_APOC = """
+CALL apoc.meta.stats() YIELD nodeCount, relCount, labels, relTypesCount
+RETURN nodeCount AS node_count, relCount AS relationship_count,
+       keys(labels) AS labels, keys(relTypesCount) AS relationship_types
+"""
+_PROCEDURE_NOT_FOUND = "Neo.ClientError.Procedure.ProcedureNotFound"
+_apoc_stats_available: bool = True
+
+# Fallback without APOC. One round trip: each CALL subquery returns a single row, so they combine without fan-out
+_Q_STATS = """
+CALL { MATCH (n) RETURN count(n) AS node_count }
+CALL { MATCH ()-[r]->() RETURN count(r) AS relationship_count }
+CALL { CALL db.labels() YIELD label RETURN collect(label) AS labels }
+CALL { CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS relationship_types }
+RETURN node_count, relationship_count, labels, relationship_types
+"""
+
+
+def _read_stats() -> dict[str, Any]:
+    """Run the APOC stats query, falling back to _Q_STATS for good if APOC is missing"""
+    global _apoc_stats_available
+    if _apoc_stats_available:
+        try:
+            return run_read(_Q_STATS_APOC)[0].data()
+        except ClientError as e:
+            if e.code != _PROCEDURE_NOT_FOUND:
+                raise
+            logger.warning("apoc.meta.stats unavailable, counting by scan instead")
+            _apoc_stats_available = False
+    return run_read(_Q_STATS)[0].data()
+
 
 @utils_bp.route('/health', methods=['GET'])
 def health() -> tuple[WerkzeugResponse, int]:
-    return jsonify({"status": "healthy"}), 200
+    return json_response({"status": "healthy"}, 200)
 
 
 @utils_bp.route('/stats', methods=['GET'])
+@handle_db_errors("getting stats")
 def get_stats() -> tuple[WerkzeugResponse, int]:
+    """Graph counts, cached for STATS_CACHE_TTL seconds unless ?fresh=1 is passed
+
+    If Neo4j fails, the last known good body is served (stale) rather than a 500.
+    """
+    global _stats_cache
+    fresh = request.args.get('fresh') == '1'
+    now = time.monotonic()
+
+    if not fresh and _stats_cache is not None and now - _stats_cache[0] < STATS_CACHE_TTL:
+        return raw_json_response(_stats_cache[1])
+    # Read even when fresh: a recount is stored against the generation it started at
+    generation, cached = cache.get_graph("stats")
+    if not fresh and cached is not None:
+        _stats_cache = (now, cached)
+        return raw_json_response(cached)
+
     try:
-        driver = get_db()
-        with driver.session() as session:
-            node_count = session.run("MATCH (n) RETURN count(n) as count").single()["count"]
-            rel_count = session.run("MATCH ()-[r]->() RETURN count(r) as count").single()["count"]
-            labels = [record["label"] for record in session.run("CALL db.labels()")]
-            rel_types = [record["relationshipType"] for record in session.run("CALL db.relationshipTypes()")]
-
-            return jsonify({
-                "stats": {
-                    "node_count": node_count,
-                    "relationship_count": rel_count,
-                    "labels": labels,
-                    "relationship_types": rel_types
-                }
-            }), 200
-    except Neo4jError as e:
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error"}), 500
+        stats = _read_stats()
+    except (Neo4jError, DriverError) as e:
+        if _stats_cache is None:
+            raise
+        logger.warning("Serving stale stats, Neo4j error: %s", e)
+        return raw_json_response(_stats_cache[1])
+    body = dumps({"stats": stats})
+    cache.set_graph("stats", body, generation)
+    _stats_cache = (now, body)
+    return raw_json_response(body)
+
+
+@utils_bp.route('/cache/stats', methods=['GET'])
+def cache_stats() -> tuple[WerkzeugResponse, int]:
+    return json_response({"cache": cache.stats()})
+
+
+@utils_bp.route('/cache/clear', methods=['POST'])
+def clear_cache() -> tuple[WerkzeugResponse, int]:
+    global _stats_cache
+    cache.clear()
+    _stats_cache = None
+    return json_response({"message": "Cache cleared"})
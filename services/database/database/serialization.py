@@ -0,0 +1,88 @@
+from typing import Any, Callable, Iterable, Iterator
+
+import orjson
+from flask import Response, request, stream_with_context
+from flask_orjson import OrjsonProvider
+
+
+def _default(value: Any) -> Any:
+    # Neo4j temporal types (neo4j.time.DateTime, Date, Time, Duration)
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    return OrjsonProvider.default(value)
+
+
+class Neo4jJSONProvider(OrjsonProvider):
+    """orjson-backed JSON provider that also understands Neo4j value types"""
+    default = staticmethod(_default)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes with the same options as the app provider"""
+    return orjson.dumps(obj, option=Neo4jJSONProvider.option, default=_default)
+
+
+def load_json() -> Any:
+    """Parse the request body with orjson, returning None if it is empty or invalid"""
+    # cache=False: the body is parsed once, so skip keeping a second copy on the request
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def raw_json_response(body: bytes, status: int = 200) -> tuple[Response, int]:
+    """Wrap already-serialized JSON bytes in a response"""
+    return Response(body, mimetype='application/json'), status
+
+
+def json_response(payload: Any, status: int = 200) -> tuple[Response, int]:
+    """Serialize a payload straight to a response, bypassing jsonify and the app provider"""
+    return raw_json_response(dumps(payload), status)
+
+
+def error_response(message: str, status: int) -> tuple[Response, int]:
+    """Build an {"error": message} response"""
+    return json_response({"error": message}, status)
+
+
+STREAM_CHUNK_SIZE: int = 64 * 1024
+
+
+def stream_json_list(
+    field: str,
+    items: Iterable[Any],
+    on_complete: Callable[[bytes], None] | None = None
+) -> tuple[Response, int]:
+    """Stream {"<field>": [...], "count": n} as items arrive instead of buffering the whole list
+
+    Items are serialized one at a time and flushed in ~64KB chunks. If on_complete is
+    given it receives the full body once the stream finishes (e.g. to populate a cache).
+    """
+    def generate() -> Iterator[bytes]:
+        body: list[bytes] = []
+        buffer = bytearray(b'{"' + field.encode() + b'":[')
+        count = 0
+        for item in items:
+            if count:
+                buffer += b','
+            buffer += dumps(item)
+            count += 1
+            if len(buffer) >= STREAM_CHUNK_SIZE:
+                chunk = bytes(buffer)
+                if on_complete:
+                    body.append(chunk)
+                yield chunk
+                buffer.clear()
+        buffer += b'],"count":' + str(count).encode() + b'}'
+        chunk = bytes(buffer)
+        yield chunk
+        if on_complete:
+            body.append(chunk)
+            on_complete(b''.join(body))
+
+    # Keep the request context (and its Neo4j session) alive until the stream is drained
+    return Response(stream_with_context(generate()), mimetype='application/json'), 200
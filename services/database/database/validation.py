@@ -1,22 +1,50 @@
 import re
+from functools import lru_cache
 
-IDENTIFIER_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+# Matches a newline-joined batch of identifiers in one C-level scan
+_IDENTIFIER_BATCH_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\n[A-Za-z_][A-Za-z0-9_]*)*', re.ASCII)
 
+# Below this size the per-value loop is cheaper than joining
+_BATCH_THRESHOLD = 8
 
-def validate_identifier(value: str, name: str = "identifier") -> tuple[bool, str | None]:
-    """Validate Cypher identifier to prevent injection attacks"""
+
+# Labels and relationship types repeat across requests, so results for short values are
+# memoized; longer ones skip the cache so it can't fill up with large request strings
+_CACHED_IDENTIFIER_MAX_LENGTH = 255
+
+
+def _check_identifier(value: str, name: str) -> tuple[bool, str | None]:
     if not value:
         return False, f"{name} cannot be empty"
-    if not IDENTIFIER_PATTERN.match(value):
+    # For ASCII input isidentifier() is exactly [a-zA-Z_][a-zA-Z0-9_]*, checked in C
+    if not (value.isascii() and value.isidentifier()):
         return False, f"{name} must contain only alphanumeric characters and underscores, and start with a letter"
     if len(value) > 65535:  # Neo4j max identifier length
         return False, f"{name} is too long (max 65535 characters)"
     return True, None
 
 
+_check_identifier_cached = lru_cache(maxsize=2048)(_check_identifier)
+
+
+def validate_identifier(value: str, name: str = "identifier") -> tuple[bool, str | None]:
+    """Validate Cypher identifier to prevent injection attacks"""
+    if isinstance(value, str) and len(value) <= _CACHED_IDENTIFIER_MAX_LENGTH:
+        return _check_identifier_cached(value, name)
+    return _check_identifier(value, name)
+
+
 def validate_identifiers(values: list[str], name: str = "identifiers") -> tuple[bool, str | None]:
-    for value in values:
-        is_valid, error = validate_identifier(value, name)
-        if not is_valid:
-            return False, error
-    return True, None
+    if len(values) > _BATCH_THRESHOLD and all(isinstance(value, str) for value in values):
+        # Fast path: validate the whole batch at once, fall back to the loop for the error message.
+        # The separator count has to match too, or a value containing "\n" would read as two
+        joined = '\n'.join(values)
+        if (
+            max(map(len, values)) <= 65535
+            and joined.count('\n') == len(values) - 1
+            and _IDENTIFIER_BATCH_PATTERN.fullmatch(joined)
+        ):
+            return True, None
+    errors = (validate_identifier(value, name)[1] for value in values)
+    error = next((error for error in errors if error), None)
+    return error is None, error
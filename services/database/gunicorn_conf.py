@@ -0,0 +1,14 @@
+"""Gunicorn settings for the database service"""
+import multiprocessing
+import os
+
+bind = "0.0.0.0:5000"
+
+# Requests mostly wait on Bolt, so gevent lets each worker hold many of them in flight
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+
+# Import the app after fork so every worker builds its own Neo4j driver and pool;
+# drivers must not be shared across fork()
+preload_app = False
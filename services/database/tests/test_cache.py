@@ -0,0 +1,67 @@
+import fakeredis
+import pytest
+
+from database import cache as cache_module
+from database.cache import GRAPH_GENERATION_KEY, RedisCache
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(cache_module.redis, "Redis", lambda connection_pool: client)
+    return client
+
+
+@pytest.fixture
+def cache(redis_client):
+    return RedisCache("redis://localhost:6379/0")
+
+
+def test_get_graph_returns_body_stored_at_current_generation(cache):
+    generation, cached = cache.get_graph("node:1")
+    assert generation is not None
+    assert cached is None
+
+    cache.set_graph("node:1", b'{"id":"1"}', generation)
+
+    assert cache.get_graph("node:1") == (generation, b'{"id":"1"}')
+
+
+def test_invalidate_graph_retires_cached_reads(cache):
+    generation, _ = cache.get_graph("label:Person")
+    cache.set_graph("label:Person", b'{"nodes":[]}', generation)
+
+    new_generation = cache.invalidate_graph()
+
+    assert new_generation != generation
+    assert cache.get_graph("label:Person") == (new_generation, None)
+
+
+def test_read_that_raced_a_write_is_not_stored(cache, redis_client):
+    # The read starts, a write lands before its stream finishes, then the read completes
+    generation, _ = cache.get_graph("cypher:abc")
+    cache.invalidate_graph()
+    cache.set_graph("cypher:abc", b'{"results":[]}', generation)
+
+    assert redis_client.get("cypher:abc") is None
+    assert cache.get_graph("cypher:abc")[1] is None
+
+
+def test_evicted_generation_does_not_revive_old_entries(cache, redis_client):
+    generation, _ = cache.get_graph("node:1")
+    cache.set_graph("node:1", b'{"id":"1"}', generation)
+    cache.invalidate_graph()
+    redis_client.delete(GRAPH_GENERATION_KEY)
+
+    new_generation, cached = cache.get_graph("node:1")
+
+    assert cached is None
+    assert int(new_generation) > int(generation)
+
+
+def test_disabled_cache_never_stores():
+    cache = RedisCache(None)
+
+    assert cache.get_graph("node:1") == (None, None)
+    cache.set_graph("node:1", b"{}", None)
+    assert cache.invalidate_graph() is None
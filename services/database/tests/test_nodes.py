@@ -0,0 +1,40 @@
+import fakeredis
+import pytest
+from flask import Flask
+
+from database import cache as cache_module
+from database.cache import RedisCache
+from database.routes import nodes
+
+
+@pytest.fixture
+def graph_cache(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(cache_module.redis, "Redis", lambda connection_pool: client)
+    graph_cache = RedisCache("redis://localhost:6379/0")
+    monkeypatch.setattr(nodes, "cache", graph_cache)
+    return graph_cache
+
+
+@pytest.fixture
+def client(graph_cache):
+    app = Flask(__name__)
+    app.register_blueprint(nodes.nodes_bp)
+    return app.test_client()
+
+
+def test_update_node_retires_cached_relationships_of_the_node(client, graph_cache, monkeypatch):
+    # Relationship bodies embed their endpoint nodes, so they go stale with a property update
+    keys = ["noderels:4:0:all:", "rel:5:0:1", "node:4:0:1"]
+    for key in keys:
+        generation, _ = graph_cache.get_graph(key)
+        graph_cache.set_graph(key, b'{"name":"old"}', generation)
+
+    node = {"id": "4:0:1", "labels": ["Person"], "properties": {"name": "new"}}
+    monkeypatch.setattr(nodes, "run_write", lambda query, parameters: [{"n": node}])
+    monkeypatch.setattr(nodes, "node_to_dict", lambda n: n)
+
+    response = client.put("/nodes/4:0:1", json={"properties": {"name": "new"}})
+
+    assert response.status_code == 200
+    assert all(graph_cache.get_graph(key)[1] is None for key in keys)
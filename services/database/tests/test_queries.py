@@ -0,0 +1,54 @@
+import fakeredis
+import pytest
+from flask import Flask
+from neo4j import Record
+
+from database import cache as cache_module
+from database.cache import RedisCache
+from database.routes import queries
+
+_READ = {"query": "MATCH (p:Person) RETURN p.name AS name"}
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(cache_module.redis, "Redis", lambda connection_pool: client)
+    monkeypatch.setattr(queries, "cache", RedisCache("redis://localhost:6379/0"))
+
+    names = ["Alice"]
+    monkeypatch.setattr(queries, "stream_read", lambda query, parameters: iter([Record({"name": n}) for n in names]))
+
+    def run_write(query, parameters):
+        names.append(parameters["name"])
+        return []
+    monkeypatch.setattr(queries, "run_write", run_write)
+    return names
+
+
+@pytest.fixture
+def client(graph):
+    app = Flask(__name__)
+    app.register_blueprint(queries.queries_bp)
+    return app.test_client()
+
+
+def _names(response):
+    return [row["name"] for row in response.get_json()["results"]]
+
+
+def test_cypher_read_is_cached_until_a_write(client, graph):
+    assert _names(client.post("/query/cypher", json=_READ)) == ["Alice"]
+    graph.append("Bob")  # Changed behind the service's back
+    assert _names(client.post("/query/cypher", json=_READ)) == ["Alice"]
+
+    client.post("/query/cypher", json={"query": "CREATE (:Person {name: $name})", "parameters": {"name": "Carol"}})
+
+    assert _names(client.post("/query/cypher", json=_READ)) == ["Alice", "Bob", "Carol"]
+
+
+def test_cypher_read_can_opt_out_of_the_cache(client, graph):
+    client.post("/query/cypher", json=_READ)
+    graph.append("Bob")
+
+    assert _names(client.post("/query/cypher", json={**_READ, "cache": False})) == ["Alice", "Bob"]
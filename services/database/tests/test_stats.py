@@ -0,0 +1,39 @@
+import pytest
+from flask import Flask
+from neo4j.exceptions import ServiceUnavailable
+
+from database.routes import utils
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(utils, "_stats_cache", None)
+    monkeypatch.setattr(utils.cache, "get_graph", lambda key: (None, None))
+    monkeypatch.setattr(utils.cache, "set_graph", lambda *args, **kwargs: None)
+
+    app = Flask(__name__)
+    app.register_blueprint(utils.utils_bp)
+    return app.test_client()
+
+
+def _unavailable(*args, **kwargs):
+    raise ServiceUnavailable("Neo4j is down")
+
+
+def test_stats_serves_stale_body_when_neo4j_unavailable(client, monkeypatch):
+    monkeypatch.setattr(utils, "_stats_cache", (0.0, b'{"stats":{"node_count":3}}'))
+    monkeypatch.setattr(utils, "run_read", _unavailable)
+
+    response = client.get("/stats?fresh=1")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"stats": {"node_count": 3}}
+
+
+def test_stats_returns_500_when_neo4j_unavailable_and_nothing_cached(client, monkeypatch):
+    monkeypatch.setattr(utils, "run_read", _unavailable)
+
+    response = client.get("/stats")
+
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "Internal server error"}
@@ -1,25 +1,52 @@
+import atexit
 import logging
+import os
+import queue
 import sys
-import traceback
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any
 
-from typing import Any
-
-from flask import Flask, jsonify, request
+from flask import Flask, Request, jsonify, request
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from .config import UPLOAD_DIR
+from .config import LOG_LEVEL, UPLOAD_DIR, USE_X_SENDFILE
 from .routes import persons, files
+from .serialization import FileshareJSONProvider
+from .storage import INCOMING_DIR, incoming_file_stream
+
+# Records are formatted by the thread that logs them; only the stdout write goes to the listener
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+
+class FileshareRequest(Request):
+    def _get_file_stream(
+        self,
+        total_content_length: int | None,
+        content_type: str | None,
+        filename: str | None = None,
+        content_length: int | None = None
+    ) -> IO[bytes]:
+        # Spool large uploads next to their destination (see storage.INCOMING_DIR)
+        return incoming_file_stream(total_content_length)
+
+
 app = Flask(__name__)
+app.request_class = FileshareRequest
+app.json = FileshareJSONProvider(app)
+app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
 
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+INCOMING_DIR.mkdir(exist_ok=True)
 
 app.register_blueprint(persons.bp)
 app.register_blueprint(files.bp)
@@ -33,10 +60,12 @@ def health() -> tuple[WerkzeugResponse, int]:
 
 @app.errorhandler(500)
 def internal_error(error: Any) -> tuple[WerkzeugResponse, int]:
-    logger.error(f"Internal Server Error: {error}")
-    logger.error(f"Request: {request.method} {request.url}")
-    logger.error(f"Request data: {request.get_data(as_text=True)[:500]}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    # Formatting the stack is costly under a flood of 500s, so only do it when debugging
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.error("Internal Server Error: %s", error, exc_info=debug)
+    logger.error("Request: %s %s", request.method, request.url)
+    # Read at most 500 bytes instead of buffering and decoding the whole body
+    logger.error("Request data: %s", request.stream.read(500).decode("utf-8", errors="replace"))
 
     return jsonify({
         "error": "Internal server error",
@@ -47,9 +76,9 @@ def internal_error(error: Any) -> tuple[WerkzeugResponse, int]:
 
 @app.errorhandler(Exception)
 def handle_exception(error: Exception) -> tuple[WerkzeugResponse, int]:
-    logger.error(f"Unhandled exception: {error}")
-    logger.error(f"Request: {request.method} {request.url}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.error("Unhandled exception: %s: %s", type(error).__name__, error, exc_info=debug)
+    logger.error("Request: %s %s", request.method, request.url)
 
     return jsonify({
         "error": "Internal server error",
@@ -60,4 +89,5 @@ def handle_exception(error: Exception) -> tuple[WerkzeugResponse, int]:
 
 if __name__ == "__main__":
     logger.info("Starting fileshare service on port 5000")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Development server only; containers run gunicorn (see Dockerfile)
+    app.run(host="0.0.0.0", port=5000, debug=os.getenv("FLASK_ENV") == "development")
@@ -3,3 +3,9 @@ from pathlib import Path
 
 UPLOAD_DIR: Path = Path(os.getenv("UPLOAD_DIR", "/app/uploads"))
 DATABASE_URL: str = os.getenv("DATABASE_URL", "http://database:5000")
+# Keep-alive connections to the database service kept per worker; size it to the number
+# of greenlets that may call the database at once
+DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "64"))
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+# Hand downloads to a front proxy that honours X-Sendfile instead of streaming them from a worker
+USE_X_SENDFILE: bool = os.getenv("USE_X_SENDFILE", "false").lower() in ("1", "true", "yes")
@@ -1,37 +1,93 @@
 import logging
+import re
+from functools import lru_cache
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from .config import DATABASE_URL
+from .config import DATABASE_POOL_SIZE, DATABASE_URL
 
 logger = logging.getLogger(__name__)
 
+# One pooled session per process so calls reuse keep-alive connections instead of
+# reconnecting each time. Retry only covers idempotent methods (urllib3's default)
+_session = requests.Session()
+# The database service gzips larger JSON bodies; requests decompresses transparently
+_session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=DATABASE_POOL_SIZE,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Built once; most calls go to the same handful of URLs
+_BASE_URL = DATABASE_URL.rstrip("/")
+_CYPHER_URL = _BASE_URL + "/query/cypher"
+
+# Bodies are encoded with orjson up front rather than by requests' stdlib json, which
+# dominated the cost of sending large batch payloads (e.g. a bulk file create)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Quoted literals in Cypher sent from here almost always mean a value was interpolated
+# instead of passed in "parameters", which defeats Neo4j's plan cache
+_STRING_LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+
+@lru_cache(maxsize=256)
+def _warn_if_inlined(query: str) -> None:
+    if _STRING_LITERAL_PATTERN.search(query):
+        logger.warning("Cypher query contains inline string literals, use parameters instead: %s", query.strip()[:200])
+
 
 def call_database(method: str, endpoint: str, json: dict | None = None) -> dict:
     """Make HTTP request to database service with timeout and error handling"""
-    url = f"{DATABASE_URL}/{endpoint}"
-    logger.debug(f"Database request: {method} {url}")
+    return _send(method, _BASE_URL + "/" + endpoint, json)
+
+
+def post_cypher(query: str, parameters: dict | None = None, use_cache: bool = True) -> dict:
+    """Run a parameterized Cypher query through the database service's /query/cypher
+
+    Pass use_cache=False for reads that guard a write, so they always see the live graph.
+    """
+    body = {"query": query, "parameters": parameters or {}}
+    if not use_cache:
+        body["cache"] = False
+    return _send("POST", _CYPHER_URL, body)
+
+
+def _send(method: str, url: str, json: dict | None) -> dict:
+    logger.debug("Database request: %s %s", method, url)
     if json:
-        logger.debug(f"Request payload: {json}")
+        # Lazy %s args: large payloads are only rendered if DEBUG is actually emitted
+        logger.debug("Request payload: %s", json)
+        if "query" in json:
+            _warn_if_inlined(json["query"])
 
     try:
-        response = requests.request(method, url, json=json, timeout=10)
-        logger.debug(f"Database response: {response.status_code}")
+        if json is None:
+            response = _session.request(method, url, timeout=10)
+        else:
+            response = _session.request(method, url, data=orjson.dumps(json), headers=_JSON_HEADERS, timeout=10)
+        logger.debug("Database response: %s", response.status_code)
 
         response.raise_for_status()
         result = response.json()
-        logger.debug(f"Response data: {result}")
+        logger.debug("Response data: %s", result)
         return result
     except requests.Timeout as e:
-        logger.error(f"Database request timeout: {method} {url} - {e}")
+        logger.error("Database request timeout: %s %s - %s", method, url, e)
         raise RuntimeError(f"Database service timeout: {e}")
     except requests.ConnectionError as e:
-        logger.error(f"Database connection error: {method} {url} - {e}")
+        logger.error("Database connection error: %s %s - %s", method, url, e)
         raise RuntimeError(f"Database service unreachable: {e}")
     except requests.HTTPError as e:
-        logger.error(f"Database HTTP error: {method} {url} - Status {response.status_code} - {e}")
-        logger.error(f"Response body: {response.text[:500]}")
+        logger.error("Database HTTP error: %s %s - Status %s - %s", method, url, response.status_code, e)
+        logger.error("Response body: %s", response.text[:500])
         raise RuntimeError(f"Database service HTTP error: {e}")
     except requests.RequestException as e:
-        logger.error(f"Database request failed: {method} {url} - {e}")
+        logger.error("Database request failed: %s %s - %s", method, url, e)
         raise RuntimeError(f"Database service error: {e}")
@@ -0,0 +1,30 @@
+"""Prebuilt JSON bodies for the common error responses"""
+import orjson
+from flask import Response
+
+
+def raw_json_response(body: bytes, status: int) -> tuple[Response, int]:
+    """Wrap already-serialized JSON bytes in a response"""
+    return Response(body, mimetype="application/json"), status
+
+
+def error_response(message: str, status: int) -> tuple[Response, int]:
+    """Build an {"error": message} response with orjson, skipping jsonify"""
+    return raw_json_response(orjson.dumps({"error": message}), status)
+
+
+ERR_NO_FILE: bytes = orjson.dumps({"error": "No file provided"})
+ERR_NO_FILES: bytes = orjson.dumps({"error": "No files provided"})
+ERR_PERSON_REQUIRED: bytes = orjson.dumps({"error": "person is required"})
+ERR_INVALID_PERSON_DATA: bytes = orjson.dumps({"error": "Invalid person data from database"})
+ERR_INVALID_FILE_DATA: bytes = orjson.dumps({"error": "Invalid file data from database"})
+ERR_FILE_DELETED: bytes = orjson.dumps({"error": "File has been deleted"})
+ERR_FILE_NOT_ON_DISK: bytes = orjson.dumps({"error": "File not found on disk"})
+ERR_EDIT_DELETED: bytes = orjson.dumps({"error": "Cannot edit deleted file"})
+ERR_ALREADY_DELETED: bytes = orjson.dumps({"error": "File already deleted"})
+ERR_NO_FILE_SELECTED: bytes = orjson.dumps({"error": "No file selected"})
+ERR_FILENAME_EMPTY: bytes = orjson.dumps({"error": "Filename cannot be empty"})
+ERR_FILENAME_TOO_LONG: bytes = orjson.dumps({"error": "Filename is too long (max 255 characters)"})
+ERR_FILENAME_HIDDEN: bytes = orjson.dumps({"error": "Hidden files are not allowed"})
+ERR_FILENAME_PATH: bytes = orjson.dumps({"error": "Filename contains invalid path components"})
+ERR_FILENAME_CONTROL: bytes = orjson.dumps({"error": "Filename contains control characters"})
@@ -1,54 +1,138 @@
-from .db_client import call_database
+import time
 
+from .db_client import call_database, post_cypher
+
+# Short-lived, per-worker memo behind GET /persons and GET /persons/<name>. Only found
+# persons are kept, so a person just created through another worker is never reported
+# missing. Write paths use fetch_person: a node deleted and recreated elsewhere gets a
+# new element id, which a cached copy would not have
+PERSON_CACHE_TTL: float = 5.0
+PERSON_CACHE_MAX_ENTRIES: int = 4096
+_person_cache: dict[str, tuple[float, dict]] = {}
+_person_list_cache: tuple[float, dict] | None = None
+
+# The lookups below gate writes and downloads, so they bypass the database service's
+# read cache (use_cache=False) and always see the live graph
+_Q_PERSONS_BY_NAMES = """
+UNWIND $names AS n
+OPTIONAL MATCH (p:Person {name: n})
+RETURN n AS name, p
+"""
+
+_Q_FILES_BY_PERSON_AND_FILENAMES = """
+UNWIND $pairs AS pair
+MATCH (p:Person {name: pair[0]})-[:UPLOADED]->(f:File {filename: pair[1]})
+RETURN pair[0] AS person, pair[1] AS filename, f
+"""
+
+_Q_PERSON_AND_FILE = """
+OPTIONAL MATCH (p:Person {name: $person_name})
+WITH p LIMIT 1
+OPTIONAL MATCH (p)-[:UPLOADED]->(f:File {filename: $filename})
+RETURN p, f LIMIT 1
+"""
+
+
+def get_persons_by_names(names: list[str]) -> dict[str, dict]:
+    """Look up many persons in one round-trip, keyed by name (missing names are omitted)"""
+    if not names:
+        return {}
+
+    result = post_cypher(_Q_PERSONS_BY_NAMES, {"names": names}, use_cache=False)
+
+    persons: dict[str, dict] = {}
+    for record in result.get("results", []):
+        if record.get("p"):
+            # Keep the first match per name, like the former LIMIT 1
+            persons.setdefault(record["name"], record["p"])
+    return persons
+
+
+def _cache_person(name: str, person: dict) -> None:
+    if len(_person_cache) >= PERSON_CACHE_MAX_ENTRIES:
+        _person_cache.clear()
+    _person_cache[name] = (time.monotonic(), person)
+
+
+def remember_person(person: dict) -> None:
+    """Cache a newly created person and drop the cached listing it is missing from"""
+    global _person_list_cache
+    _cache_person(person["properties"]["name"], person)
+    _person_list_cache = None
 
-def get_person_by_name(name: str) -> dict | None:
-    query_data = {
-        "query": """
-            MATCH (p:Person {name: $name})
-            RETURN p
-            LIMIT 1
-        """,
-        "parameters": {
-            "name": name
-        }
-    }
 
-    result = call_database("POST", "query/cypher", query_data)
+def fetch_person(name: str) -> tuple[bool, dict | None]:
+    """Answer "does this person exist" and return the node from the same round-trip"""
+    person = get_persons_by_names([name]).get(name)
+    return person is not None, person
 
-    if result.get("results") and len(result["results"]) > 0:
-        record = result["results"][0]
-        if "p" in record:
-            return record["p"]
 
-    return None
+def fetch_cached_person(name: str) -> tuple[bool, dict | None]:
+    """fetch_person, answered from a cache for up to PERSON_CACHE_TTL seconds once found"""
+    entry = _person_cache.get(name)
+    if entry is not None and time.monotonic() - entry[0] < PERSON_CACHE_TTL:
+        return True, entry[1]
+
+    exists, person = fetch_person(name)
+    if person is not None:
+        _cache_person(name, person)
+    return exists, person
+
+
+def fetch_person_list() -> dict:
+    """The database service's Person listing, answered from a cache for up to PERSON_CACHE_TTL seconds"""
+    global _person_list_cache
+    if _person_list_cache is not None and time.monotonic() - _person_list_cache[0] < PERSON_CACHE_TTL:
+        return _person_list_cache[1]
+    result = call_database("GET", "nodes/label/Person", None)
+    _person_list_cache = (time.monotonic(), result)
+    return result
+
+
+def get_person_by_name(name: str) -> dict | None:
+    return fetch_person(name)[1]
 
 
 def person_exists(name: str) -> bool:
-    return get_person_by_name(name) is not None
+    return fetch_person(name)[0]
 
 
-def get_file_by_person_and_filename(person_name: str, filename: str) -> dict | None:
-    query_data = {
-        "query": """
-            MATCH (p:Person {name: $person_name})-[:UPLOADED]->(f:File {filename: $filename})
-            RETURN f
-            LIMIT 1
-        """,
-        "parameters": {
-            "person_name": person_name,
-            "filename": filename
-        }
-    }
+def get_files_by_person_and_filenames(pairs: list[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+    """Look up many (person_name, filename) pairs in one round-trip, keyed by pair"""
+    if not pairs:
+        return {}
 
-    result = call_database("POST", "query/cypher", query_data)
+    result = post_cypher(_Q_FILES_BY_PERSON_AND_FILENAMES, {
+        "pairs": [[person_name, filename] for person_name, filename in pairs]
+    }, use_cache=False)
 
-    if result.get("results") and len(result["results"]) > 0:
-        record = result["results"][0]
-        if "f" in record:
-            return record["f"]
+    files: dict[tuple[str, str], dict] = {}
+    for record in result.get("results", []):
+        # Keep the first match per pair, like the former LIMIT 1
+        files.setdefault((record["person"], record["filename"]), record["f"])
+    return files
 
-    return None
+
+def fetch_file_for_person(person_name: str, filename: str) -> tuple[bool, dict | None]:
+    """Answer "does this person have this file" and return the node from the same round-trip"""
+    file_node = get_files_by_person_and_filenames([(person_name, filename)]).get((person_name, filename))
+    return file_node is not None, file_node
+
+
+def get_file_by_person_and_filename(person_name: str, filename: str) -> dict | None:
+    return fetch_file_for_person(person_name, filename)[1]
 
 
 def file_exists_for_person(person_name: str, filename: str) -> bool:
-    return get_file_by_person_and_filename(person_name, filename) is not None
+    return fetch_file_for_person(person_name, filename)[0]
+
+
+def fetch_person_and_file(person_name: str, filename: str) -> tuple[dict | None, dict | None]:
+    """Return the person node and their file node from one round-trip (either may be None)"""
+    result = post_cypher(
+        _Q_PERSON_AND_FILE, {"person_name": person_name, "filename": filename}, use_cache=False
+    )
+    records = result.get("results", [])
+    if not records:
+        return None, None
+    return records[0].get("p"), records[0].get("f")
@@ -8,26 +8,85 @@ from werkzeug.datastructures import FileStorage
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
 from ..config import UPLOAD_DIR
-from ..db_client import call_database
+from ..db_client import call_database, post_cypher
+from ..errors import (
+    ERR_ALREADY_DELETED,
+    ERR_EDIT_DELETED,
+    ERR_FILE_DELETED,
+    ERR_FILE_NOT_ON_DISK,
+    ERR_INVALID_FILE_DATA,
+    ERR_INVALID_PERSON_DATA,
+    ERR_NO_FILE,
+    ERR_NO_FILES,
+    ERR_PERSON_REQUIRED,
+    error_response,
+    raw_json_response
+)
 from ..person_utils import (
-    get_person_by_name,
+    fetch_person,
+    fetch_person_and_file,
     file_exists_for_person,
-    get_file_by_person_and_filename
+    get_files_by_person_and_filenames
 )
+from ..storage import cached_exists, delete_upload, save_upload, save_uploads
 from ..validation import sanitize_filename, validate_file_upload, validate_content_type
 
 logger = logging.getLogger(__name__)
 bp = Blueprint("files", __name__, url_prefix="/files")
 
+# Stored when the client sends no Content-Type for a part
+_DEFAULT_MIME = "application/octet-stream"
+
+# Nodes, UPLOADED edges and UPLOADED_WITH pairs in one write. UPLOADED_WITH is stored
+# once per pair (readers match it undirected); the unit subquery keeps the row even
+# when a single-file batch has no pairs
+_Q_BULK_CREATE_FILES = """
+MATCH (p:Person) WHERE elementId(p) = $person_id
+UNWIND $files AS props
+CREATE (p)-[:UPLOADED {timestamp: $timestamp}]->(f:File)
+SET f = props
+WITH collect(f) AS files
+CALL {
+    WITH files
+    UNWIND range(0, size(files) - 2) AS i
+    UNWIND range(i + 1, size(files) - 1) AS j
+    WITH files[i] AS a, files[j] AS b
+    CREATE (a)-[:UPLOADED_WITH]->(b)
+}
+UNWIND files AS f
+RETURN f
+"""
+
+_Q_CREATE_FILE = """
+MATCH (p:Person) WHERE elementId(p) = $person_id
+CREATE (p)-[:UPLOADED {timestamp: $timestamp}]->(f:File)
+SET f = $properties
+RETURN f
+"""
+
+_Q_EDIT_FILE = """
+MATCH (p:Person), (f:File) WHERE elementId(p) = $person_id AND elementId(f) = $file_id
+SET f += $properties
+CREATE (p)-[:EDITED {timestamp: $timestamp}]->(f)
+RETURN f
+"""
+
+# Projected to maps in Cypher: the database service only converts top-level nodes
+_Q_BATCH_RELATED = """
+MATCH (f1:File)-[:UPLOADED_WITH]-(f2:File)
+WHERE elementId(f1) = $file_id
+RETURN [f IN collect(f2) | {id: elementId(f), labels: labels(f), properties: properties(f)}] AS related
+"""
+
 
 def get_current_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
 def validate_person(person_name: str) -> tuple[dict | None, tuple[WerkzeugResponse, int] | None]:
-    person_node = get_person_by_name(person_name)
-    if not person_node:
-        return None, (jsonify({"error": f"Person '{person_name}' not found"}), 404)
+    exists, person_node = fetch_person(person_name)
+    if not exists:
+        return None, error_response(f"Person '{person_name}' not found", 404)
     return person_node, None
 
 
@@ -35,63 +94,93 @@ def validate_person_and_file(
     person_name: str,
     filename: str
 ) -> tuple[tuple[dict, dict] | None, tuple[WerkzeugResponse, int] | None]:
-    person_node, error = validate_person(person_name)
-    if error:
-        return None, error
+    person_node, file_node = fetch_person_and_file(person_name, filename)
+    if person_node is None:
+        return None, error_response(f"Person '{person_name}' not found", 404)
 
-    file_node = get_file_by_person_and_filename(person_name, filename)
-    if not file_node:
-        return None, (jsonify({"error": f"File '{filename}' not found for person '{person_name}'"}), 404)
+    if file_node is None:
+        return None, error_response(f"File '{filename}' not found for person '{person_name}'", 404)
 
     return (person_node, file_node), None
 
 
-def create_relationship(from_node_id: str, to_node_id: str, rel_type: str) -> None:
-    logger.debug(f"Creating {rel_type} relationship: {from_node_id} -> {to_node_id}")
+def create_relationship(from_node_id: str, to_node_id: str, rel_type: str, timestamp: str) -> None:
+    logger.debug("Creating %s relationship: %s -> %s", rel_type, from_node_id, to_node_id)
 
     rel_data = {
         "from_node": from_node_id,
         "to_node": to_node_id,
         "type": rel_type,
         "properties": {
-            "timestamp": get_current_timestamp()
+            "timestamp": timestamp
         }
     }
 
     try:
         result = call_database("POST", "relationships", rel_data)
-        logger.debug(f"Relationship created successfully: {result}")
+        logger.debug("Relationship created successfully: %s", result)
     except RuntimeError as e:
-        logger.error(f"Failed to create {rel_type} relationship: {e}")
+        logger.error("Failed to create %s relationship: %s", rel_type, e)
         raise
 
 
-def create_file_node(file: FileStorage, safe_filename: str) -> dict:
-    file_path = UPLOAD_DIR / safe_filename
-
-    file_data = {
-        "labels": ["File"],
-        "properties": {
-            "filename": safe_filename,
-            "size": file_path.stat().st_size,
-            "content_type": file.content_type or "application/octet-stream",
-            "created_at": get_current_timestamp(),
-            "updated_at": get_current_timestamp(),
-            "deleted": False
-        }
+def build_file_properties(file: FileStorage, safe_filename: str, size: int, timestamp: str) -> dict:
+    return {
+        "filename": safe_filename,
+        "size": size,
+        "content_type": file.content_type or _DEFAULT_MIME,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "deleted": False
     }
 
-    return call_database("POST", "nodes", file_data)
+
+def _single_file(result: dict, action: str) -> dict:
+    records = result.get("results", [])
+    if not records:
+        raise RuntimeError(f"Database returned no file node when {action}")
+    return records[0]["f"]
+
+
+def create_file_and_link(person_id: str, properties: dict, timestamp: str) -> dict:
+    """Create a File node and the person's UPLOADED edge to it in one query"""
+    result = post_cypher(_Q_CREATE_FILE, {
+        "person_id": person_id,
+        "properties": properties,
+        "timestamp": timestamp
+    })
+    return _single_file(result, "creating file")
+
+
+def update_file_and_link(person_id: str, file_id: str, properties: dict, timestamp: str) -> dict:
+    """Update a File node's properties and add the person's EDITED edge in one query"""
+    result = post_cypher(_Q_EDIT_FILE, {
+        "person_id": person_id,
+        "file_id": file_id,
+        "properties": properties,
+        "timestamp": timestamp
+    })
+    return _single_file(result, "editing file")
+
+
+def bulk_create_files_and_edges(person_id: str, files_props: list[dict], timestamp: str) -> list[dict]:
+    """Create the File nodes, their UPLOADED edges and the UPLOADED_WITH pairs in one query"""
+    result = post_cypher(_Q_BULK_CREATE_FILES, {
+        "person_id": person_id,
+        "files": files_props,
+        "timestamp": timestamp
+    })
+    return [record["f"] for record in result.get("results", [])]
 
 
 @bp.route("/upload", methods=["POST"])
 def upload_file() -> tuple[WerkzeugResponse, int]:
     """Upload file and create UPLOADED relationship"""
     if "file" not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+        return raw_json_response(ERR_NO_FILE, 400)
 
     if "person" not in request.form:
-        return jsonify({"error": "person is required"}), 400
+        return raw_json_response(ERR_PERSON_REQUIRED, 400)
 
     file = request.files["file"]
     person_name = request.form["person"]
@@ -113,16 +202,19 @@ def upload_file() -> tuple[WerkzeugResponse, int]:
         return error
 
     if file_exists_for_person(person_name, safe_filename):
-        return jsonify({"error": f"File '{safe_filename}' already exists for person '{person_name}'"}), 409
+        return error_response(f"File '{safe_filename}' already exists for person '{person_name}'", 409)
 
     file_path = UPLOAD_DIR / safe_filename
     try:
-        file.save(file_path)
+        size = save_upload(file, file_path)
     except Exception as e:
-        return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
+        return error_response(f"Failed to save file: {str(e)}", 500)
 
-    file_node = create_file_node(file, safe_filename)
-    create_relationship(person_node["id"], file_node["id"], "UPLOADED")
+    # One timestamp for the node and its edge
+    timestamp = get_current_timestamp()
+    file_node = create_file_and_link(
+        person_node["id"], build_file_properties(file, safe_filename, size, timestamp), timestamp
+    )
 
     return jsonify({
         "file": file_node,
@@ -130,11 +222,8 @@ def upload_file() -> tuple[WerkzeugResponse, int]:
     }), 201
 
 
-def process_single_batch_file(
-    file: FileStorage,
-    person_name: str,
-    seen_filenames: set[str]
-) -> tuple[dict | None, tuple[WerkzeugResponse, int] | None]:
+def validate_batch_file(file: FileStorage) -> tuple[str | None, tuple[WerkzeugResponse, int] | None]:
+    """Run the checks on one file of a batch that don't need the database"""
     is_valid, error = validate_file_upload(file)
     if not is_valid:
         return None, error
@@ -147,79 +236,82 @@ def process_single_batch_file(
     if not is_valid:
         return None, error
 
-    if safe_filename in seen_filenames:
-        return None, (jsonify({"error": f"Duplicate filename in batch: '{safe_filename}'"}), 400)
-
-    if file_exists_for_person(person_name, safe_filename):
-        return None, (jsonify({"error": f"File '{safe_filename}' already exists for person '{person_name}'"}), 409)
-
-    file_path = UPLOAD_DIR / safe_filename
-    try:
-        file.save(file_path)
-    except Exception as e:
-        return None, (jsonify({"error": f"Failed to save file '{safe_filename}': {str(e)}"}), 500)
+    return safe_filename, None
 
-    file_node = create_file_node(file, safe_filename)
-    return file_node, None
 
+def _first_duplicate(names: list[str]) -> str | None:
+    seen: set[str] = set()
+    for name in names:
+        if name in seen:
+            return name
+        seen.add(name)
+    return None
 
-def create_batch_relationships(file_ids: list[str]) -> None:
-    """Create bidirectional UPLOADED_WITH relationships between all files"""
-    for i, file_id_a in enumerate(file_ids):
-        for file_id_b in file_ids[i + 1:]:
-            rel_data = {
-                "from_node": file_id_a,
-                "to_node": file_id_b,
-                "type": "UPLOADED_WITH",
-                "properties": {}
-            }
-            call_database("POST", "relationships", rel_data)
 
-            rel_data = {
-                "from_node": file_id_b,
-                "to_node": file_id_a,
-                "type": "UPLOADED_WITH",
-                "properties": {}
-            }
-            call_database("POST", "relationships", rel_data)
+def _delete_uploads(file_paths: list[Path]) -> None:
+    for file_path in file_paths:
+        delete_upload(file_path)
 
 
 @bp.route("/upload/batch", methods=["POST"])
 def upload_batch() -> tuple[WerkzeugResponse, int]:
     """Upload multiple files and create UPLOADED_WITH relationships"""
     if "person" not in request.form:
-        return jsonify({"error": "person is required"}), 400
+        return raw_json_response(ERR_PERSON_REQUIRED, 400)
 
     person_name = request.form["person"]
     files = request.files.getlist("files")
 
     if not files:
-        return jsonify({"error": "No files provided"}), 400
+        return raw_json_response(ERR_NO_FILES, 400)
 
     person_node, error = validate_person(person_name)
     if error:
         return error
 
-    person_element_id = person_node["id"]
-    uploaded_files: list[dict] = []
-    file_ids: list[str] = []
-    seen_filenames: set[str] = set()
-
+    safe_filenames: list[str] = []
     for file in files:
-        file_node, error = process_single_batch_file(file, person_name, seen_filenames)
+        safe_filename, error = validate_batch_file(file)
         if error:
             return error
 
-        safe_filename = file_node["properties"]["filename"]
-        seen_filenames.add(safe_filename)
+        safe_filenames.append(safe_filename)
+
+    # Only a batch that actually repeats a name pays for finding which one
+    if len(set(safe_filenames)) != len(safe_filenames):
+        return error_response(f"Duplicate filename in batch: '{_first_duplicate(safe_filenames)}'", 400)
+
+    # One existence check for the whole batch instead of one round-trip per file
+    existing = get_files_by_person_and_filenames([(person_name, name) for name in safe_filenames])
+    for safe_filename in safe_filenames:
+        if (person_name, safe_filename) in existing:
+            return error_response(f"File '{safe_filename}' already exists for person '{person_name}'", 409)
 
-        file_id = file_node["id"]
-        file_ids.append(file_id)
-        uploaded_files.append(file_node)
+    file_paths = [UPLOAD_DIR / name for name in safe_filenames]
+    sizes = save_uploads(files, file_paths)
 
-        create_relationship(person_element_id, file_id, "UPLOADED")
+    # One timestamp for the whole batch rather than several per file
+    timestamp = get_current_timestamp()
+    files_props: list[dict] = []
+    for file, safe_filename, size in zip(files, safe_filenames, sizes):
+        if isinstance(size, Exception):
+            # The other saves ran in parallel and may have completed; no node will reference them
+            _delete_uploads(file_paths)
+            return error_response(f"Failed to save file '{safe_filename}': {str(size)}", 500)
 
-    create_batch_relationships(file_ids)
+        files_props.append(build_file_properties(file, safe_filename, size, timestamp))
+
+    try:
+        uploaded_files = bulk_create_files_and_edges(person_node["id"], files_props, timestamp)
+    except Exception:
+        _delete_uploads(file_paths)
+        raise
+
+    # The create is one transaction, so a short result means the person was deleted
+    # after the preflight and nothing was created
+    if len(uploaded_files) < len(files_props):
+        _delete_uploads(file_paths)
+        return error_response(f"Person '{person_name}' not found", 404)
 
     return jsonify({
         "files": uploaded_files,
@@ -245,46 +337,51 @@ def list_files() -> tuple[WerkzeugResponse, int]:
 @bp.route("/<person_name>/<filename>/download", methods=["GET"])
 def download_file(person_name: str, filename: str) -> tuple[WerkzeugResponse, int]:
     """Download file and create DOWNLOADED relationship"""
-    logger.info(f"Download request: person={person_name}, filename={filename}")
+    logger.info("Download request: person=%s, filename=%s", person_name, filename)
 
     try:
         safe_filename, error = sanitize_filename(filename)
         if error:
-            logger.warning(f"Filename sanitization failed: {filename}")
+            logger.warning("Filename sanitization failed: %s", filename)
             return error
 
         result, error = validate_person_and_file(person_name, safe_filename)
         if error:
-            logger.warning(f"Validation failed for {person_name}/{safe_filename}")
+            logger.warning("Validation failed for %s/%s", person_name, safe_filename)
             return error
 
         person_node, file_node = result
 
         if not person_node.get("id"):
-            logger.error(f"Person node missing ID field: {person_node}")
-            return jsonify({"error": "Invalid person data from database"}), 500
+            logger.error("Person node missing ID field: %s", person_node)
+            return raw_json_response(ERR_INVALID_PERSON_DATA, 500)
 
         if not file_node.get("id"):
-            logger.error(f"File node missing ID field: {file_node}")
-            return jsonify({"error": "Invalid file data from database"}), 500
+            logger.error("File node missing ID field: %s", file_node)
+            return raw_json_response(ERR_INVALID_FILE_DATA, 500)
 
         if file_node.get("properties", {}).get("deleted", False):
-            logger.warning(f"Attempted to download deleted file: {person_name}/{safe_filename}")
-            return jsonify({"error": "File has been deleted"}), 404
+            logger.warning("Attempted to download deleted file: %s/%s", person_name, safe_filename)
+            return raw_json_response(ERR_FILE_DELETED, 404)
 
         file_path = UPLOAD_DIR / safe_filename
 
-        if not file_path.exists():
-            logger.error(f"File not found on disk: {file_path} (but exists in database)")
-            return jsonify({"error": "File not found on disk"}), 404
+        if not cached_exists(file_path):
+            logger.error("File not found on disk: %s (but exists in database)", file_path)
+            return raw_json_response(ERR_FILE_NOT_ON_DISK, 404)
 
-        create_relationship(person_node["id"], file_node["id"], "DOWNLOADED")
+        create_relationship(person_node["id"], file_node["id"], "DOWNLOADED", get_current_timestamp())
 
-        logger.info(f"Sending file: {safe_filename}")
-        return send_file(file_path, as_attachment=True, download_name=safe_filename)
+        logger.info("Sending file: %s", safe_filename)
+        try:
+            return send_file(file_path, as_attachment=True, download_name=safe_filename)
+        except FileNotFoundError:
+            # The exists() answer was cached and the file has since been removed
+            logger.error("File not found on disk: %s (but exists in database)", file_path)
+            return raw_json_response(ERR_FILE_NOT_ON_DISK, 404)
 
     except Exception as e:
-        logger.error(f"Unexpected error in download_file: {e}", exc_info=True)
+        logger.error("Unexpected error in download_file: %s", e, exc_info=True)
         return jsonify({
             "error": "Internal server error during file download",
             "message": str(e)
@@ -295,7 +392,7 @@ def download_file(person_name: str, filename: str) -> tuple[WerkzeugResponse, in
 def edit_file(person_name: str, filename: str) -> tuple[WerkzeugResponse, int]:
     """Edit file and create EDITED relationship"""
     if "file" not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+        return raw_json_response(ERR_NO_FILE, 400)
 
     file = request.files["file"]
 
@@ -318,25 +415,20 @@ def edit_file(person_name: str, filename: str) -> tuple[WerkzeugResponse, int]:
     person_node, file_node = result
 
     if file_node.get("properties", {}).get("deleted", False):
-        return jsonify({"error": "Cannot edit deleted file"}), 400
+        return raw_json_response(ERR_EDIT_DELETED, 400)
 
     file_path = UPLOAD_DIR / safe_filename
     try:
-        file.save(file_path)
+        size = save_upload(file, file_path)
     except Exception as e:
-        return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
-
-    file_id = file_node["id"]
-    update_data = {
-        "properties": {
-            "size": file_path.stat().st_size,
-            "content_type": file.content_type or "application/octet-stream",
-            "updated_at": get_current_timestamp()
-        }
-    }
+        return error_response(f"Failed to save file: {str(e)}", 500)
 
-    updated_node = call_database("PUT", f"nodes/{file_id}", update_data)
-    create_relationship(person_node["id"], file_id, "EDITED")
+    timestamp = get_current_timestamp()
+    updated_node = update_file_and_link(person_node["id"], file_node["id"], {
+        "size": size,
+        "content_type": file.content_type or _DEFAULT_MIME,
+        "updated_at": timestamp
+    }, timestamp)
 
     return jsonify({
         "file": updated_node,
@@ -358,16 +450,15 @@ def delete_file(person_name: str, filename: str) -> tuple[WerkzeugResponse, int]
     person_node, file_node = result
 
     if file_node.get("properties", {}).get("deleted", False):
-        return jsonify({"error": "File already deleted"}), 400
+        return raw_json_response(ERR_ALREADY_DELETED, 400)
 
     file_path = UPLOAD_DIR / safe_filename
     file_id = file_node["id"]
 
-    if file_path.exists():
-        try:
-            file_path.unlink()
-        except Exception as e:
-            return jsonify({"error": f"Failed to delete physical file: {str(e)}"}), 500
+    try:
+        delete_upload(file_path)
+    except Exception as e:
+        return error_response(f"Failed to delete physical file: {str(e)}", 500)
 
     update_data = {
         "properties": {
@@ -421,23 +512,11 @@ def get_batch_related(person_name: str, filename: str) -> tuple[WerkzeugResponse
     person_node, file_node = result
     file_id = file_node["id"]
 
-    query_data = {
-        "query": """
-            MATCH (f1:File)-[:UPLOADED_WITH]-(f2:File)
-            WHERE elementId(f1) = $file_id
-            RETURN f2
-        """,
-        "parameters": {
-            "file_id": file_id
-        }
-    }
-
-    result = call_database("POST", "query/cypher", query_data)
+    result = post_cypher(_Q_BATCH_RELATED, {"file_id": file_id})
 
-    related_files: list[dict] = []
-    for record in result.get("results", []):
-        if "f2" in record:
-            related_files.append(record["f2"])
+    # collect() always yields exactly one row, so the list comes back ready-made
+    records = result.get("results", [])
+    related_files: list[dict] = records[0]["related"] if records else []
 
     return jsonify({
         "person": person_name,
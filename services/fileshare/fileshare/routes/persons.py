@@ -5,11 +5,34 @@ from typing import Any
 from flask import Blueprint, request, jsonify
 from werkzeug.wrappers.response import Response as WerkzeugResponse
 
-from ..db_client import call_database
-from ..person_utils import person_exists, get_person_by_name
+from ..db_client import post_cypher
+from ..person_utils import fetch_cached_person, fetch_person_list, remember_person
 
 bp = Blueprint("persons", __name__, url_prefix="/persons")
 
+# Check and insert in one round-trip; MERGE also keeps concurrent creates of the same
+# name from both succeeding. ON CREATE sets a marker that only this query can see, which
+# tells a fresh node apart from an existing one, and it is removed before returning
+_Q_CREATE_PERSON = """
+MERGE (p:Person {name: $name})
+ON CREATE SET p += $properties, p._created = true
+WITH p, coalesce(p._created, false) AS created
+REMOVE p._created
+RETURN p, created
+"""
+
+# Existence and files in one round-trip; collect() still yields a row when there are none.
+# The database service only converts top-level nodes, so the list is projected to the
+# same {id, labels, properties} shape here
+_Q_PERSON_FILES = """
+OPTIONAL MATCH (p:Person {name: $person_name})
+WITH p LIMIT 1
+OPTIONAL MATCH (p)-[:UPLOADED]->(f:File)
+RETURN p IS NOT NULL AS found, [file IN collect(f) | {
+    id: elementId(file), labels: labels(file), properties: properties(file)
+}] AS files
+"""
+
 
 @bp.route("", methods=["POST"])
 def create_person() -> tuple[WerkzeugResponse, int]:
@@ -21,28 +44,29 @@ def create_person() -> tuple[WerkzeugResponse, int]:
 
     name: str = data["name"]
 
-    if person_exists(name):
-        return jsonify({"error": f"Person with name '{name}' already exists"}), 409
-
-    person_data = {
-        "labels": ["Person"],
+    result = post_cypher(_Q_CREATE_PERSON, {
+        "name": name,
         "properties": {
             "name": name,
             "email": data.get("email", ""),
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-    }
+    })
+    record = result["results"][0]
+
+    if not record["created"]:
+        return jsonify({"error": f"Person with name '{name}' already exists"}), 409
 
-    result = call_database("POST", "nodes", person_data)
-    return jsonify(result), 201
+    remember_person(record["p"])
+    return jsonify(record["p"]), 201
 
 
 @bp.route("/<person_name>", methods=["GET"])
 def get_person(person_name: str) -> tuple[WerkzeugResponse, int]:
     """Get person by name"""
-    person = get_person_by_name(person_name)
+    exists, person = fetch_cached_person(person_name)
 
-    if not person:
+    if not exists:
         return jsonify({"error": f"Person '{person_name}' not found"}), 404
 
     return jsonify(person)
@@ -51,32 +75,16 @@ def get_person(person_name: str) -> tuple[WerkzeugResponse, int]:
 @bp.route("", methods=["GET"])
 def list_persons() -> tuple[WerkzeugResponse, int]:
     """List all persons"""
-    result = call_database("GET", "nodes/label/Person", None)
-    return jsonify(result)
+    return jsonify(fetch_person_list())
 
 
 @bp.route("/<person_name>/files", methods=["GET"])
 def get_person_files(person_name: str) -> tuple[WerkzeugResponse, int]:
     """Get files uploaded by person"""
-    person = get_person_by_name(person_name)
-    if not person:
-        return jsonify({"error": f"Person '{person_name}' not found"}), 404
-
-    query_data = {
-        "query": """
-            MATCH (p:Person {name: $person_name})-[:UPLOADED]->(f:File)
-            RETURN f
-        """,
-        "parameters": {
-            "person_name": person_name
-        }
-    }
+    result = post_cypher(_Q_PERSON_FILES, {"person_name": person_name})
+    record = result["results"][0]
 
-    result = call_database("POST", "query/cypher", query_data)
-
-    files: list[dict] = []
-    for record in result.get("results", []):
-        if "f" in record:
-            files.append(record["f"])
+    if not record["found"]:
+        return jsonify({"error": f"Person '{person_name}' not found"}), 404
 
-    return jsonify({"person": person_name, "files": files})
+    return jsonify({"person": person_name, "files": record["files"]})
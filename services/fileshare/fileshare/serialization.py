@@ -0,0 +1,17 @@
+from typing import Any
+
+import orjson
+from flask import Response
+from flask_orjson import OrjsonProvider
+
+
+class FileshareJSONProvider(OrjsonProvider):
+    """orjson-backed JSON provider whose jsonify responses carry orjson's bytes as-is"""
+    # Non-string keys were accepted by the stdlib encoder, so keep accepting them
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # OrjsonProvider.dumps decodes to str for Flask to re-encode; skip the round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, option=self.option, default=self.default)
+        return self._app.response_class(body, mimetype="application/json")
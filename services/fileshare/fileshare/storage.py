@@ -0,0 +1,120 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO
+
+from gevent.monkey import is_module_patched
+from gevent.threadpool import ThreadPool
+from werkzeug.datastructures import FileStorage
+
+from .config import UPLOAD_DIR
+
+# Large multipart files are spooled here by the form parser, on the same filesystem as
+# UPLOAD_DIR, so saving one is a hard link instead of a second full write. The name is
+# hidden, and sanitize_filename rejects hidden names, so it can't be reached via routes
+INCOMING_DIR: Path = UPLOAD_DIR / ".incoming"
+# Same size Werkzeug keeps in memory before spilling to a temporary file
+SPOOL_THRESHOLD: int = 500 * 1024
+
+# Werkzeug's FileStorage.save copies in 16 KiB reads; larger chunks mean far fewer syscalls
+COPY_BUFFER_SIZE: int = 1 << 20
+
+# Short-lived, per-worker memo of whether an upload is on disk, so hot downloads skip a stat
+EXISTS_CACHE_TTL: float = 1.0
+EXISTS_CACHE_MAX_ENTRIES: int = 4096
+_exists_cache: dict[str, tuple[float, bool]] = {}
+
+# Writes to different files are independent and release the GIL, so batches overlap them
+SAVE_WORKERS: int = 8
+_save_executor: ThreadPool | ThreadPoolExecutor
+if is_module_patched("threading"):
+    # Under the gevent worker ThreadPoolExecutor threads are greenlets and every write would
+    # block the hub; gevent's pool runs them on real threads and only parks the calling greenlet
+    _save_executor = ThreadPool(SAVE_WORKERS)
+else:
+    _save_executor = ThreadPoolExecutor(max_workers=SAVE_WORKERS, thread_name_prefix="upload-save")
+
+
+def _remember_exists(file_path: Path, exists: bool) -> None:
+    if len(_exists_cache) >= EXISTS_CACHE_MAX_ENTRIES:
+        _exists_cache.clear()
+    _exists_cache[str(file_path)] = (time.monotonic(), exists)
+
+
+def cached_exists(file_path: Path) -> bool:
+    """file_path.exists(), answered from a cache for up to EXISTS_CACHE_TTL seconds"""
+    entry = _exists_cache.get(str(file_path))
+    if entry is not None and time.monotonic() - entry[0] < EXISTS_CACHE_TTL:
+        return entry[1]
+    exists = file_path.exists()
+    _remember_exists(file_path, exists)
+    return exists
+
+
+def incoming_file_stream(total_content_length: int | None) -> IO[bytes]:
+    """Stream for the form parser: memory for small requests, INCOMING_DIR otherwise"""
+    if total_content_length is not None and total_content_length <= SPOOL_THRESHOLD:
+        return io.BytesIO()
+    return tempfile.NamedTemporaryFile("w+b", dir=INCOMING_DIR)
+
+
+def _link_spooled(file: FileStorage, file_path: Path) -> int | None:
+    """Publish an upload spooled in INCOMING_DIR under file_path, or None if it wasn't"""
+    spooled = getattr(file.stream, "name", None)
+    if not isinstance(spooled, str) or Path(spooled).parent != INCOMING_DIR:
+        return None
+    file.stream.flush()
+    # Link under a unique name, then rename over the target so readers never see a partial file
+    staged = INCOMING_DIR / uuid.uuid4().hex
+    try:
+        os.link(spooled, staged)
+    except OSError:
+        return None
+    os.replace(staged, file_path)
+    return os.fstat(file.stream.fileno()).st_size
+
+
+def save_upload(file: FileStorage, file_path: Path) -> int:
+    """Put an uploaded file at file_path, returning its size in bytes
+
+    Spooled uploads are hard-linked into place; anything else is copied in 1 MiB chunks.
+    """
+    size = _link_spooled(file, file_path)
+    if size is not None:
+        _remember_exists(file_path, True)
+        return size
+
+    with open(file_path, "wb", buffering=0) as out:
+        shutil.copyfileobj(file.stream, out, length=COPY_BUFFER_SIZE)
+        # The write position is the size, so callers don't need to stat the file again
+        size = out.tell()
+        if hasattr(os, "posix_fadvise"):
+            # Uploads are written once and rarely read back right away, so hint the
+            # kernel not to keep them cached at the expense of hotter pages
+            os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    _remember_exists(file_path, True)
+    return size
+
+
+def _save_or_error(item: tuple[FileStorage, Path]) -> int | Exception:
+    file, file_path = item
+    try:
+        return save_upload(file, file_path)
+    except Exception as e:
+        return e
+
+
+def save_uploads(files: list[FileStorage], file_paths: list[Path]) -> list[int | Exception]:
+    """Save several uploads concurrently, returning each size (or the error raised) in order"""
+    return list(_save_executor.map(_save_or_error, zip(files, file_paths)))
+
+
+def delete_upload(file_path: Path) -> None:
+    """Remove an uploaded file if it is present"""
+    file_path.unlink(missing_ok=True)
+    _remember_exists(file_path, False)
@@ -15,6 +15,14 @@ def database_url():
     return os.getenv("DATABASE_URL", "http://database:5000")
 
 
+@pytest.fixture(scope="session")
+def http():
+    # Keep-alive connections to the services are reused across the whole run
+    session = requests.Session()
+    yield session
+    session.close()
+
+
 @pytest.fixture(scope="session")
 def neo4j_driver():
     uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
@@ -26,25 +34,38 @@ def neo4j_driver():
     driver.close()
 
 
+@pytest.fixture(scope="session")
+def neo4j_database():
+    return os.getenv("NEO4J_DATABASE", "neo4j")
+
+
+@pytest.fixture(scope="session")
+def neo4j_session(neo4j_driver, neo4j_database):
+    # One session for the whole run so per-test cleanup doesn't open and close its own
+    with neo4j_driver.session(database=neo4j_database) as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
-def cleanup_test_data(neo4j_driver):
+def cleanup_test_data(neo4j_session):
     yield
 
-    with neo4j_driver.session() as session:
-        session.run(
-            "MATCH (p:Person) WHERE p.name STARTS WITH 'TestUser' "
-            "OPTIONAL MATCH (p)-[r]-() DELETE r, p"
+    def delete_test_data(tx):
+        tx.run(
+            "MATCH (p:Person) WHERE p.name STARTS WITH 'TestUser' DETACH DELETE p"
         )
-        session.run(
-            "MATCH (f:File) WHERE f.filename STARTS WITH 'test_' "
-            "OPTIONAL MATCH (f)-[r]-() DELETE r, f"
+        tx.run(
+            "MATCH (f:File) WHERE f.filename STARTS WITH 'test_' DETACH DELETE f"
         )
 
+    # Both deletes commit together in one transaction
+    neo4j_session.execute_write(delete_test_data)
+
 
 @pytest.fixture(scope="function")
-def test_person(fileshare_url, cleanup_test_data):
+def test_person(fileshare_url, http, cleanup_test_data):
     person_name = "TestUser1"
-    response = requests.post(
+    response = http.post(
         f"{fileshare_url}/persons",
         json={"name": person_name, "email": f"{person_name.lower()}@test.com"}
     )
@@ -1,20 +1,21 @@
 """Integration tests for fileshare service with database verification."""
 
 import io
-import requests
 
 
-def test_person_creation_in_database(fileshare_url, neo4j_driver, cleanup_test_data):
+def test_person_creation_in_database(
+    fileshare_url, http, neo4j_driver, neo4j_database, cleanup_test_data
+):
     """Test that creating a person via API creates a node in Neo4j."""
     person_name = "TestUser_PersonCreation"
     email = "testuser_personcreation@test.com"
-    response = requests.post(
+    response = http.post(
         f"{fileshare_url}/persons",
         json={"name": person_name, "email": email}
     )
     assert response.status_code in [200, 201]
 
-    with neo4j_driver.session() as session:
+    with neo4j_driver.session(database=neo4j_database) as session:
         result = session.run(
             "MATCH (p:Person {name: $name}) RETURN p.name, p.email",
             name=person_name
@@ -25,8 +26,24 @@ def test_person_creation_in_database(fileshare_url, neo4j_driver, cleanup_test_d
         assert record["p.email"] == email
 
 
+def test_duplicate_person_creation_conflicts(
+    fileshare_url, http, neo4j_driver, neo4j_database, test_person
+):
+    """Test that creating an existing person returns 409 and leaves no marker on the node."""
+    response = http.post(f"{fileshare_url}/persons", json={"name": test_person})
+    assert response.status_code == 409
+
+    with neo4j_driver.session(database=neo4j_database) as session:
+        record = session.run(
+            "MATCH (p:Person {name: $name}) RETURN count(p) AS persons, collect(keys(p)) AS keys",
+            name=test_person
+        ).single()
+        assert record["persons"] == 1
+        assert "_created" not in record["keys"][0]
+
+
 def test_file_upload_creates_nodes_and_relationships(
-    fileshare_url, neo4j_driver, test_person
+    fileshare_url, http, neo4j_driver, neo4j_database, test_person
 ):
     """Test that uploading a file creates File node and UPLOADED relationship."""
     filename = "test_upload.txt"
@@ -34,10 +51,10 @@ def test_file_upload_creates_nodes_and_relationships(
     files = {"file": (filename, io.BytesIO(file_content), "text/plain")}
     data = {"person": test_person}
 
-    response = requests.post(f"{fileshare_url}/files/upload", files=files, data=data)
+    response = http.post(f"{fileshare_url}/files/upload", files=files, data=data)
     assert response.status_code in [200, 201]
 
-    with neo4j_driver.session() as session:
+    with neo4j_driver.session(database=neo4j_database) as session:
         result = session.run(
             "MATCH (f:File {filename: $filename}) RETURN f.filename, f.size, f.content_type",
             filename=filename
@@ -48,7 +65,6 @@ def test_file_upload_creates_nodes_and_relationships(
         assert record["f.size"] == len(file_content)
         assert record["f.content_type"] == "text/plain"
 
-    with neo4j_driver.session() as session:
         result = session.run(
             """
             MATCH (p:Person {name: $person_name})-[r:UPLOADED]->(f:File {filename: $filename})
@@ -62,23 +78,25 @@ def test_file_upload_creates_nodes_and_relationships(
         assert record["r.timestamp"] is not None
 
 
-def test_file_download_creates_relationship(fileshare_url, neo4j_driver, test_person):
+def test_file_download_creates_relationship(
+    fileshare_url, http, neo4j_driver, neo4j_database, test_person
+):
     """Test that downloading a file creates DOWNLOADED relationship."""
     filename = "test_download.txt"
     file_content = b"Test file for download"
     files = {"file": (filename, io.BytesIO(file_content), "text/plain")}
     data = {"person": test_person}
 
-    response = requests.post(f"{fileshare_url}/files/upload", files=files, data=data)
+    response = http.post(f"{fileshare_url}/files/upload", files=files, data=data)
     assert response.status_code in [200, 201]
 
-    response = requests.get(
+    response = http.get(
         f"{fileshare_url}/files/{test_person}/{filename}/download"
     )
     assert response.status_code == 200
     assert response.content == file_content
 
-    with neo4j_driver.session() as session:
+    with neo4j_driver.session(database=neo4j_database) as session:
         result = session.run(
             """
             MATCH (p:Person {name: $person_name})-[r:DOWNLOADED]->(f:File {filename: $filename})
@@ -92,26 +110,28 @@ def test_file_download_creates_relationship(fileshare_url, neo4j_driver, test_pe
         assert record["download_count"] == 1, "DOWNLOADED relationship not found"
 
 
-def test_file_edit_creates_relationship(fileshare_url, neo4j_driver, test_person):
+def test_file_edit_creates_relationship(
+    fileshare_url, http, neo4j_driver, neo4j_database, test_person
+):
     """Test that editing a file creates EDITED relationship."""
     filename = "test_edit.txt"
     original_content = b"Original content"
     files = {"file": (filename, io.BytesIO(original_content), "text/plain")}
     data = {"person": test_person}
 
-    response = requests.post(f"{fileshare_url}/files/upload", files=files, data=data)
+    response = http.post(f"{fileshare_url}/files/upload", files=files, data=data)
     assert response.status_code in [200, 201]
 
     new_content = b"Edited content"
     files = {"file": (filename, io.BytesIO(new_content), "text/plain")}
 
-    response = requests.put(
+    response = http.put(
         f"{fileshare_url}/files/{test_person}/{filename}",
         files=files
     )
     assert response.status_code == 200
 
-    with neo4j_driver.session() as session:
+    with neo4j_driver.session(database=neo4j_database) as session:
         result = session.run(
             """
             MATCH (p:Person {name: $person_name})-[r:EDITED]->(f:File {filename: $filename})
@@ -125,7 +145,9 @@ def test_file_edit_creates_relationship(fileshare_url, neo4j_driver, test_person
         assert record["edit_count"] == 1, "EDITED relationship not found"
 
 
-def test_batch_upload_creates_relationships(fileshare_url, neo4j_driver, test_person):
+def test_batch_upload_creates_relationships(
+    fileshare_url, http, neo4j_driver, neo4j_database, test_person
+):
     """Test that batch uploading files creates UPLOADED_WITH relationships."""
     file1_name = "test_batch_1.txt"
     file2_name = "test_batch_2.txt"
@@ -138,14 +160,14 @@ def test_batch_upload_creates_relationships(fileshare_url, neo4j_driver, test_pe
     ]
     data = {"person": test_person}
 
-    response = requests.post(
+    response = http.post(
         f"{fileshare_url}/files/upload/batch",
         files=files,
         data=data
     )
     assert response.status_code in [200, 201]
 
-    with neo4j_driver.session() as session:
+    with neo4j_driver.session(database=neo4j_database) as session:
         result = session.run(
             "MATCH (f:File) WHERE f.filename IN [$file1, $file2] RETURN count(f) as file_count",
             file1=file1_name,
@@ -154,7 +176,6 @@ def test_batch_upload_creates_relationships(fileshare_url, neo4j_driver, test_pe
         record = result.single()
         assert record["file_count"] == 2, "Not all batch files found in database"
 
-    with neo4j_driver.session() as session:
         result = session.run(
             """
             MATCH (f1:File {filename: $file1})-[r:UPLOADED_WITH]-(f2:File {filename: $file2})
@@ -166,3 +187,43 @@ def test_batch_upload_creates_relationships(fileshare_url, neo4j_driver, test_pe
         record = result.single()
         assert record is not None
         assert record["relationship_count"] >= 1, "UPLOADED_WITH relationship not found"
+
+
+def test_person_files_lists_uploaded_file(fileshare_url, http, test_person):
+    """Test that a person's file listing includes a file they uploaded."""
+    filename = "test_listed.txt"
+    files = {"file": (filename, io.BytesIO(b"Listed file"), "text/plain")}
+    data = {"person": test_person}
+
+    response = http.post(f"{fileshare_url}/files/upload", files=files, data=data)
+    assert response.status_code in [200, 201]
+
+    response = http.get(f"{fileshare_url}/persons/{test_person}/files")
+    assert response.status_code == 200
+
+    listed = response.json()["files"]
+    assert [f["properties"]["filename"] for f in listed] == [filename]
+    assert listed[0]["id"]
+    assert listed[0]["labels"] == ["File"]
+
+
+def test_batch_related_lists_other_batch_files(fileshare_url, http, test_person):
+    """Test that batch-related returns the other files uploaded in the same batch."""
+    file1_name = "test_related_1.txt"
+    file2_name = "test_related_2.txt"
+
+    files = [
+        ("files", (file1_name, io.BytesIO(b"Related file 1"), "text/plain")),
+        ("files", (file2_name, io.BytesIO(b"Related file 2"), "text/plain"))
+    ]
+    data = {"person": test_person}
+
+    response = http.post(f"{fileshare_url}/files/upload/batch", files=files, data=data)
+    assert response.status_code in [200, 201]
+
+    response = http.get(f"{fileshare_url}/files/{test_person}/{file1_name}/batch-related")
+    assert response.status_code == 200
+
+    related = response.json()["related_files"]
+    assert [f["properties"]["filename"] for f in related] == [file2_name]
+    assert related[0]["labels"] == ["File"]